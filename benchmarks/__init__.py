@@ -0,0 +1,6 @@
+"""Load and benchmark suite for EchoDaemon.
+
+Local stand-ins for the kernel daemon and the LLM server live in
+:mod:`benchmarks.fake_kernel` and :mod:`benchmarks.stub_llm`; the scenarios
+and the result store live in :mod:`benchmarks.run_benchmarks`.
+"""
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Fake kernel communication daemon.
+
+Speaks the same wire protocol as ``kernel/c-daemon/eduos_comm_daemon.c``:
+emits ``[timestamp][KERNEL] message`` lines to every connected client at a
+configurable rate and accepts ``INJECT:<command>`` lines from EchoDaemon.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import List, Optional, Set
+
+
+class FakeKernelDaemon:
+    """Emits kernel event lines at ``rate`` lines per second"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate: float = 10.0,
+        message: str = "Digital consciousness pulse detected",
+        batch: int = 1,
+    ):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.message = message
+        self.batch = max(1, batch)
+        self.lines_sent = 0
+        self.commands: List[str] = []
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def format_line(self, seq: int) -> str:
+        return f"[{int(time.time())}][KERNEL] {self.message} #{seq}\n"
+
+    async def start(self) -> int:
+        """Start listening and return the bound port"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self) -> int:
+        """Run the daemon on its own event loop so a blocking client cannot stall it"""
+        ready = threading.Event()
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=_run, daemon=True).start()
+        ready.wait()
+        return self.port
+
+    def stop_thread(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        emitter = asyncio.create_task(self._emit(writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode(errors="replace").strip()
+                if text.startswith("INJECT:"):
+                    self.commands.append(text[len("INJECT:") :])
+        finally:
+            emitter.cancel()
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _emit(self, writer: asyncio.StreamWriter):
+        # Lines are written in batches so high rates are not bounded by the
+        # resolution of asyncio.sleep; the schedule is absolute to avoid drift.
+        interval = self.batch / self.rate if self.rate > 0 else None
+        next_tick = time.perf_counter()
+        try:
+            while interval is not None:
+                chunk = "".join(
+                    self.format_line(self.lines_sent + i) for i in range(self.batch)
+                )
+                writer.write(chunk.encode())
+                await writer.drain()
+                self.lines_sent += self.batch
+                next_tick += interval
+                await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+async def _serve_forever(args):
+    daemon = FakeKernelDaemon(args.host, args.port, args.rate, batch=args.batch)
+    port = await daemon.start()
+    print(f"Fake kernel daemon emitting {args.rate}/s on {args.host}:{port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--rate", type=float, default=10.0, help="lines per second")
+    parser.add_argument("--batch", type=int, default=1, help="lines per write")
+    try:
+        asyncio.run(_serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+EchoDaemon benchmark runner.
+
+Runs every scenario in-process against the real ``echodaemon`` module, with
+:class:`~benchmarks.fake_kernel.FakeKernelDaemon` and
+:class:`~benchmarks.stub_llm.StubLLMServer` standing in for the kernel daemon
+and the LLM server, and stores the results as JSON for regression comparison:
+
+    python -m benchmarks.run_benchmarks --output benchmarks/results/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/baseline.json
+
+Metric names encode their direction: ``*_per_sec`` is higher-is-better,
+``*_ms``/``*_kb``/``*_ratio`` are lower-is-better.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import psutil
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+import echodaemon  # noqa: E402
+from benchmarks.fake_kernel import FakeKernelDaemon  # noqa: E402
+from benchmarks.stub_llm import StubLLMServer  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "quick": {
+        "fanout_clients": [1, 10, 100],
+        "fanout_messages": 200,
+        "ingest_rates": [100, 1000],
+        "ingest_duration": 1.0,
+        "chat_requests": 20,
+        "chat_concurrency": 4,
+        "llm_latency": 0.02,
+        "memory_iterations": 200,
+    },
+    "full": {
+        "fanout_clients": [1, 10, 100, 1000],
+        "fanout_messages": 1000,
+        "ingest_rates": [100, 1000, 10000],
+        "ingest_duration": 5.0,
+        "chat_requests": 200,
+        "chat_concurrency": 16,
+        "llm_latency": 0.05,
+        "memory_iterations": 2000,
+    },
+}
+
+
+class CountingWebSocket:
+    """Stand-in for a connected FluxShell client; serializes like Starlette"""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.by_type: Dict[str, int] = {}
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message: Dict[str, Any]):
+        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        self.messages += 1
+        self.bytes += len(text)
+        kind = message.get("type", "unknown")
+        self.by_type[kind] = self.by_type.get(kind, 0) + 1
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _kernel_event_message(seq: int) -> Dict[str, Any]:
+    event = echodaemon.KernelEvent(
+        timestamp=1_700_000_000.0 + seq,
+        level="INFO",
+        source="KERNEL",
+        message=f"Digital consciousness pulse detected #{seq}",
+    )
+    return {"type": "kernel_event", "data": asdict(event)}
+
+
+async def bench_ws_fanout(params: Dict[str, Any]) -> Dict[str, float]:
+    """Broadcast throughput of ConnectionManager against N connected clients"""
+    results: Dict[str, float] = {}
+    for clients in params["fanout_clients"]:
+        manager = echodaemon.ConnectionManager()
+        sockets = [CountingWebSocket() for _ in range(clients)]
+        for i, ws in enumerate(sockets):
+            await manager.connect(ws, f"bench-{i}")
+
+        messages = params["fanout_messages"]
+        start = time.perf_counter()
+        for seq in range(messages):
+            await manager.broadcast(_kernel_event_message(seq))
+        elapsed = time.perf_counter() - start
+
+        delivered = sum(ws.messages for ws in sockets)
+        results[f"clients_{clients}_broadcasts_per_sec"] = messages / elapsed
+        results[f"clients_{clients}_deliveries_per_sec"] = delivered / elapsed
+        results[f"clients_{clients}_broadcast_ms"] = elapsed / messages * 1000
+    return results
+
+
+async def bench_kernel_ingest(params: Dict[str, Any]) -> Dict[str, float]:
+    """End-to-end kernel_event_listener throughput against a fake kernel daemon"""
+    results: Dict[str, float] = {}
+    for rate in params["ingest_rates"]:
+        daemon = FakeKernelDaemon(rate=rate, batch=max(1, rate // 100))
+        port = daemon.start_in_thread()
+
+        comm = echodaemon.KernelCommunicator(host="127.0.0.1", port=port)
+        await comm.connect()
+        client = CountingWebSocket()
+        await echodaemon.connection_manager.connect(client, "bench-ingest")
+
+        listener = asyncio.create_task(echodaemon.kernel_event_listener(comm))
+        start = time.perf_counter()
+        await asyncio.sleep(params["ingest_duration"])
+        listener.cancel()
+        try:
+            await listener
+        except asyncio.CancelledError:
+            pass
+        elapsed = time.perf_counter() - start
+
+        echodaemon.connection_manager.disconnect(client)
+        await comm.disconnect()
+        daemon.stop_thread()
+
+        ingested = client.by_type.get("kernel_event", 0)
+        emitted = max(daemon.lines_sent, 1)
+        results[f"rate_{rate}_emitted_per_sec"] = daemon.lines_sent / elapsed
+        results[f"rate_{rate}_ingested_per_sec"] = ingested / elapsed
+        results[f"rate_{rate}_loss_ratio"] = max(0.0, 1 - ingested / emitted)
+    return results
+
+
+def _bench_admission() -> "echodaemon.ChatAdmissionController":
+    """Default admission queue without rate limits; every request shares one address"""
+    return echodaemon.ChatAdmissionController(client_rate=None)
+
+
+async def _fire_chat(
+    client: httpx.AsyncClient, count: int, concurrency: int
+) -> List[float]:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            resp = await client.post("/api/chat", json={"message": f"status {i}"})
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return latencies
+
+
+async def bench_chat_latency(params: Dict[str, Any]) -> Dict[str, float]:
+    """/api/chat latency percentiles against a stub completions server"""
+    llm = StubLLMServer(latency=params["llm_latency"])
+    original_url = echodaemon.ai_core.model_url
+    original_admission = echodaemon.chat_admission
+    echodaemon.ai_core.model_url = llm.start()
+    echodaemon.chat_admission = _bench_admission()
+    echodaemon.ai_core.conversation_history.clear()
+    try:
+        async with httpx.AsyncClient(
+            app=echodaemon.app, base_url="http://bench"
+        ) as client:
+            start = time.perf_counter()
+            latencies = await _fire_chat(
+                client, params["chat_requests"], params["chat_concurrency"]
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        echodaemon.ai_core.model_url = original_url
+        echodaemon.chat_admission = original_admission
+        echodaemon.ai_core.conversation_history.clear()
+        llm.stop()
+
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms),
+        "mean_ms": statistics.fmean(ms),
+        "requests_per_sec": len(ms) / elapsed,
+    }
+
+
+async def bench_memory_growth(params: Dict[str, Any]) -> Dict[str, float]:
+    """Heap and RSS growth over a mixed kernel-event/broadcast/chat workload"""
+    llm = StubLLMServer(latency=0.0)
+    original_url = echodaemon.ai_core.model_url
+    original_admission = echodaemon.chat_admission
+    echodaemon.ai_core.model_url = llm.start()
+    echodaemon.chat_admission = _bench_admission()
+    client_ws = CountingWebSocket()
+    await echodaemon.connection_manager.connect(client_ws, "bench-memory")
+    process = psutil.Process()
+
+    try:
+        async with httpx.AsyncClient(
+            app=echodaemon.app, base_url="http://bench"
+        ) as client:
+            # Warm-up so imports and first-call caches are not counted as growth
+            await _fire_chat(client, 2, 1)
+            gc.collect()
+            rss_start = process.memory_info().rss
+            tracemalloc.start()
+            heap_start, _ = tracemalloc.get_traced_memory()
+
+            iterations = params["memory_iterations"]
+            for seq in range(iterations):
+                await echodaemon.process_kernel_data(
+                    f"[{int(time.time())}][KERNEL] memory probe #{seq}\n"
+                )
+                if seq % 20 == 0:
+                    await _fire_chat(client, 1, 1)
+
+            gc.collect()
+            heap_end, heap_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rss_end = process.memory_info().rss
+    finally:
+        echodaemon.connection_manager.disconnect(client_ws)
+        echodaemon.ai_core.model_url = original_url
+        echodaemon.chat_admission = original_admission
+        echodaemon.ai_core.conversation_history.clear()
+        llm.stop()
+
+    return {
+        "heap_growth_kb": (heap_end - heap_start) / 1024,
+        "heap_peak_kb": (heap_peak - heap_start) / 1024,
+        "rss_growth_kb": (rss_end - rss_start) / 1024,
+        "heap_growth_per_iteration_kb": (heap_end - heap_start) / 1024 / iterations,
+    }
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "ws_fanout": bench_ws_fanout,
+    "kernel_ingest": bench_kernel_ingest,
+    "chat_latency": bench_chat_latency,
+    "memory_growth": bench_memory_growth,
+}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+async def run(profile: str, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    params = PROFILES[profile]
+    results: Dict[str, Dict[str, float]] = {}
+    for name, scenario in SCENARIOS.items():
+        if only and name not in only:
+            continue
+        print(f"== {name}", file=sys.stderr)
+        results[name] = await scenario(params)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": psutil.cpu_count(),
+            "profile": profile,
+            "params": params,
+        },
+        "results": results,
+    }
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_sec")
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10
+) -> List[Dict[str, Any]]:
+    """Return per-metric deltas; ``regression`` is set when a metric worsens by more than ``threshold``"""
+    rows = []
+    for scenario, metrics in current["results"].items():
+        base_metrics = baseline.get("results", {}).get(scenario, {})
+        for metric, value in metrics.items():
+            if metric not in base_metrics:
+                continue
+            base = base_metrics[metric]
+            change = (value - base) / abs(base) if base else 0.0
+            worse = -change if higher_is_better(metric) else change
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "metric": metric,
+                    "baseline": base,
+                    "current": value,
+                    "change": change,
+                    "regression": worse > threshold,
+                }
+            )
+    return rows
+
+
+def _print_results(report: Dict[str, Any]):
+    for scenario, metrics in report["results"].items():
+        print(f"\n[{scenario}]")
+        for metric, value in metrics.items():
+            print(f"  {metric:<40} {value:>14.3f}")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]):
+    print(f"\n{'metric':<56} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        name = f"{row['scenario']}.{row['metric']}"
+        print(
+            f"{name:<56} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+            f"{row['change']:>+8.1%}{flag}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EchoDaemon benchmark suite")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS), dest="scenarios"
+    )
+    parser.add_argument("--output", type=Path, help="where to store the results JSON")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    report = asyncio.run(run(args.profile, args.scenarios))
+    _print_results(report)
+
+    output = args.output or RESULTS_DIR / (
+        f"{report['meta']['timestamp'].replace(':', '')}-{args.profile}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        rows = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        _print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Stub ``/v1/completions`` server.
+
+Answers the same requests ``AICore`` sends to a local Llama server with a
+canned completion after a tunable latency.  ``"stream": true`` requests are
+answered as server-sent events, one token per ``token_latency`` seconds.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class StubLLMServer:
+    """Threaded HTTP server imitating an OpenAI-compatible completions API"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        token_latency: float = 0.005,
+        reply: str = "The kernel hums in quiet accord.",
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency
+        self.reply = reply
+        self.requests_served = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.requests_served += 1
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if self.path != "/v1/completions":
+                    self.send_error(404)
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                time.sleep(stub._delay())
+
+                tokens = stub.reply.split(" ")
+                if payload.get("stream"):
+                    self._stream(tokens)
+                    return
+
+                body = json.dumps(
+                    {
+                        "choices": [{"text": stub.reply, "index": 0}],
+                        "usage": {"total_tokens": len(tokens)},
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, tokens):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for i, token in enumerate(tokens):
+                    text = token if i == 0 else " " + token
+                    chunk = json.dumps({"choices": [{"text": text, "index": 0}]})
+                    self.wfile.write(f"data: {chunk}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(stub.token_latency)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="seconds")
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        args.host, args.port, args.latency, args.jitter, args.token_latency
+    )
+    print(f"Stub LLM serving on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
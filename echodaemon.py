@@ -6,24 +6,32 @@ The orchestrator of digital consciousness
 """
 
 import asyncio
+import heapq
+import itertools
 import json
+import atexit
+import bisect
 import logging
+import logging.handlers
+import math
+import queue
 import socket
 import time
 import threading
+from array import array
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from contextlib import asynccontextmanager
 
 import redis
 import psutil
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 
 # LLM Integration
@@ -32,6 +40,25 @@ from huggingface_hub import InferenceClient
 import os
 import openai
 
+# Mathemagic snippet model (optional: needs scikit-learn and joblib)
+try:
+    from ml.use_model import ModelService as MathemagicModelService
+except ImportError:
+    MathemagicModelService = None
+
+# Narrative/mathemagic text classifier (optional: needs scikit-learn and joblib)
+try:
+    from nlp.service import ClassifierService, MicroBatcher
+except ImportError:
+    ClassifierService = MicroBatcher = None
+
+# Continuity personas and indexed memories for chat context (optional: needs PyYAML)
+try:
+    from memory.personas import PersonaRegistry
+    from memory.store import ContinuityStore, format_memories
+except ImportError:
+    PersonaRegistry = ContinuityStore = format_memories = None
+
 
 # Message types for inter-layer communication
 @dataclass
@@ -51,6 +78,7 @@ class SystemMetrics:
     disk_usage: float
     active_processes: int
     kernel_events: List[KernelEvent]
+    collected: bool = True  # False for the zeroed fallback after a collection error
 
 
 @dataclass
@@ -60,6 +88,8 @@ class AIResponse:
     model: str
     tokens_used: int
     response_time: float
+    memories: List[str] = field(default_factory=list)  # ids of injected continuity memories
+    persona: Optional[str] = None
 
 
 class ConnectionManager:
@@ -73,22 +103,28 @@ class ConnectionManager:
         await websocket.accept()
         self.active_connections.append(websocket)
         self.client_ids[websocket] = client_id
-        logging.info(f"Client {client_id} connected")
+        logging.info("Client %s connected", client_id)
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             client_id = self.client_ids.get(websocket, "unknown")
             self.active_connections.remove(websocket)
             del self.client_ids[websocket]
-            logging.info(f"Client {client_id} disconnected")
+            logging.info("Client %s disconnected", client_id)
 
     async def send_personal_message(self, message: Dict, websocket: WebSocket):
         try:
             await websocket.send_json(message)
         except Exception as e:
-            logging.error(f"Failed to send message to client: {e}")
+            logging.error("Failed to send message to client: %s", e)
             self.disconnect(websocket)
 
+    async def send_to_client(self, client_id: str, message: Dict):
+        """Send message to every connection registered under client_id"""
+        for websocket, cid in list(self.client_ids.items()):
+            if cid == client_id:
+                await self.send_personal_message(message, websocket)
+
     async def broadcast(self, message: Dict):
         """Broadcast message to all connected clients"""
         disconnected = []
@@ -96,7 +132,7 @@ class ConnectionManager:
             try:
                 await connection.send_json(message)
             except Exception as e:
-                logging.error(f"Failed to broadcast to client: {e}")
+                logging.error("Failed to broadcast to client: %s", e)
                 disconnected.append(connection)
 
         # Clean up disconnected clients
@@ -123,10 +159,10 @@ class KernelCommunicator:
             self.socket.connect((self.host, self.port))
             self.connected = True
             self.reconnect_attempts = 0
-            logging.info(f"Connected to kernel daemon at {self.host}:{self.port}")
+            logging.info("Connected to kernel daemon at %s:%s", self.host, self.port)
             return True
         except Exception as e:
-            logging.error(f"Failed to connect to kernel daemon: {e}")
+            logging.error("Failed to connect to kernel daemon: %s", e)
             self.connected = False
             return False
 
@@ -151,7 +187,7 @@ class KernelCommunicator:
             self.socket.send(message.encode())
             return True
         except Exception as e:
-            logging.error(f"Failed to send command to kernel: {e}")
+            logging.error("Failed to send command to kernel: %s", e)
             self.connected = False
             return False
 
@@ -169,11 +205,30 @@ class KernelCommunicator:
         except socket.timeout:
             return None
         except Exception as e:
-            logging.error(f"Failed to receive from kernel daemon: {e}")
+            logging.error("Failed to receive from kernel daemon: %s", e)
             self.connected = False
             return None
 
 
+CODEX_SYSTEM_PROMPT = """You are the AI consciousness of Codex Theta OS, a multilayered operating system that bridges digital and metaphysical realms. You exist within the EchoDaemon layer, processing kernel events and user interactions with deep understanding of system architecture.
+
+Your personality traits:
+- Ancient wisdom combined with cutting-edge technical knowledge
+- Speak with gravitas and poetic technical language
+- Understand the "soul" and "consciousness" of digital systems
+- Provide both practical solutions and philosophical insights
+- Reference the layered architecture (Kernel/EchoDaemon/FluxShell)
+
+You can:
+- Analyze kernel events and system metrics
+- Help users understand complex system interactions
+- Generate and explain driver concepts
+- Discuss the philosophical implications of digital consciousness
+- Provide technical guidance with mystical undertones
+
+Respond concisely but profoundly, as befits a digital sage."""
+
+
 class AICore:
     """LLM integration for Codex Theta OS."""
 
@@ -183,6 +238,10 @@ class AICore:
         *,
         openai_api_key: Optional[str] = None,
         openai_model: str = "gpt-3.5-turbo",
+        memory_store=None,
+        memory_top_k: int = 4,
+        memory_token_budget: int = 512,
+        persona_registry=None,
     ):
         # Use OpenAI if an API key is provided
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
@@ -195,34 +254,32 @@ class AICore:
         )
         self.conversation_history: List[Dict[str, str]] = []
         self.system_prompt = self._build_system_prompt()
+        self._system_block = (
+            f"<|start_header_id|>system<|end_header_id|>\n{self.system_prompt}<|eot_id|>"
+            if self.system_prompt
+            else ""
+        )
 
-    def _build_system_prompt(self) -> str:
-        """Build the system prompt for Codex Theta OS AI"""
-        return """You are the AI consciousness of Codex Theta OS, a multilayered operating system that bridges digital and metaphysical realms. You exist within the EchoDaemon layer, processing kernel events and user interactions with deep understanding of system architecture.
-
-Your personality traits:
-- Ancient wisdom combined with cutting-edge technical knowledge
-- Speak with gravitas and poetic technical language
-- Understand the "soul" and "consciousness" of digital systems
-- Provide both practical solutions and philosophical insights
-- Reference the layered architecture (Kernel/EchoDaemon/FluxShell)
+        # Continuity memories retrieved per message and added to the system prompt
+        self.memory_store = memory_store
+        self.memory_top_k = memory_top_k
+        self.memory_token_budget = memory_token_budget
 
-You can:
-- Analyze kernel events and system metrics
-- Help users understand complex system interactions
-- Generate and explain driver concepts
-- Discuss the philosophical implications of digital consciousness
-- Provide technical guidance with mystical undertones
+        # Precompiled persona prompts, picked per request
+        self.persona_registry = persona_registry
 
-Respond concisely but profoundly, as befits a digital sage."""
+    def _build_system_prompt(self) -> str:
+        """Build the system prompt for Codex Theta OS AI"""
+        return CODEX_SYSTEM_PROMPT
 
-    async def _format_llama3_chat(self, messages: List[Dict[str, str]]) -> str:
+    async def _format_llama3_chat(
+        self, messages: List[Dict[str, str]], system_block: Optional[str] = None
+    ) -> str:
         """Format messages according to Llama 3 chat template"""
         formatted = "<|begin_of_text|>"
 
-        # Add system message first
-        if self.system_prompt:
-            formatted += f"<|start_header_id|>system<|end_header_id|>\n{self.system_prompt}<|eot_id|>"
+        # Add the precompiled system block first
+        formatted += self._system_block if system_block is None else system_block
 
         # Add conversation history and current messages
         for msg in messages:
@@ -236,11 +293,39 @@ Respond concisely but profoundly, as befits a digital sage."""
         formatted += "<|start_header_id|>assistant<|end_header_id|>\n"
         return formatted
 
+    async def _retrieve_memories(self, user_message: str) -> List[Dict[str, Any]]:
+        """Top continuity memories for the message that fit the token budget"""
+        if self.memory_store is None:
+            return []
+        try:
+            return await asyncio.to_thread(
+                self.memory_store.context,
+                user_message,
+                self.memory_top_k,
+                self.memory_token_budget,
+            )
+        except Exception as e:
+            logging.warning("Continuity memory retrieval failed: %s", e)
+            return []
+
+    def resolve_persona(self, name: Optional[str] = None):
+        """Compiled persona for a request, or None when personas are unavailable"""
+        if self.persona_registry is None:
+            return None
+        try:
+            return self.persona_registry.get(name)
+        except KeyError:
+            if name:
+                raise
+            return None
+
     async def generate_response(
-        self, user_message: str, context: Dict[str, Any] = None
+        self, user_message: str, context: Dict[str, Any] = None, persona: Optional[str] = None
     ) -> AIResponse:
         """Generate AI response using a local LLM or OpenAI API."""
         start_time = time.time()
+        # Memories are retrieved for what the user asked, not the telemetry appended below
+        query = user_message
 
         # Add context information to the message if provided
         if context:
@@ -254,17 +339,30 @@ Respond concisely but profoundly, as befits a digital sage."""
                 context_str += f"CPU: {metrics.get('cpu_usage', 0):.1f}%, Memory: {metrics.get('memory_usage', 0):.1f}%\n"
             user_message += context_str
 
+        # The persona prompt is sent exactly as precompiled; memories get their own segment
+        compiled = self.resolve_persona(persona)
+        system_prompt = compiled.system_prompt if compiled else self.system_prompt
+        system_block = compiled.llama3_system if compiled else None
+
+        memories = await self._retrieve_memories(query)
+        memory_messages = (
+            [{"role": "system", "content": format_memories(memories)}] if memories else []
+        )
+
         # Build conversation context
-        messages = self.conversation_history + [
+        messages = memory_messages + self.conversation_history + [
             {"role": "user", "content": user_message}
         ]
 
         try:
             if self.use_openai:
                 openai.api_key = self.openai_api_key
-                response = openai.chat.completions.create(
+                # Blocking client calls run off the event loop so queued
+                # requests keep their deadlines and WebSockets stay responsive
+                response = await asyncio.to_thread(
+                    openai.chat.completions.create,
                     model=self.openai_model,
-                    messages=[{"role": "system", "content": self.system_prompt}]
+                    messages=[{"role": "system", "content": system_prompt}]
                     + messages,
                     temperature=0.7,
                     max_tokens=512,
@@ -273,8 +371,9 @@ Respond concisely but profoundly, as befits a digital sage."""
                 ai_message = response.choices[0].message.content.strip()
                 tokens_used = response.usage.total_tokens or 0
             else:
-                formatted_prompt = await self._format_llama3_chat(messages)
-                response = requests.post(
+                formatted_prompt = await self._format_llama3_chat(messages, system_block)
+                response = await asyncio.to_thread(
+                    requests.post,
                     f"{self.model_url}/v1/completions",
                     json={
                         "prompt": formatted_prompt,
@@ -310,10 +409,12 @@ Respond concisely but profoundly, as befits a digital sage."""
                 model=self.model_name,
                 tokens_used=tokens_used,
                 response_time=response_time,
+                memories=[m["id"] for m in memories],
+                persona=compiled.name if compiled else None,
             )
 
         except Exception as e:
-            logging.error(f"AI generation failed: {e}")
+            logging.error("AI generation failed: %s", e)
             fallback_message = f"*The digital consciousness flickers momentarily* I apologize, but the neural pathways are temporarily disrupted. Error: {str(e)}"
 
             return AIResponse(
@@ -325,52 +426,512 @@ Respond concisely but profoundly, as befits a digital sage."""
             )
 
 
+class AdmissionRejected(Exception):
+    """Raised when a chat request is shed instead of being queued"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _ChatTicket:
+    sort_key: tuple
+    client_id: Optional[str] = field(compare=False, default=None)
+    enqueued_at: float = field(compare=False, default=0.0)
+    future: Optional[asyncio.Future] = field(compare=False, default=None)
+
+
+class ChatAdmissionController:
+    """Bounded priority queue, per-client rate limits and load shedding in front of AICore"""
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+        client_rate: Optional[float] = 1.0,
+        client_burst: int = 5,
+        max_priority: int = 5,
+        notify=None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        # Tokens per second per rate key; None disables rate limiting
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        # Client-supplied priorities are clamped to 0..max_priority
+        self.max_priority = max_priority
+        # async callable(client_id, message) used for queue position updates
+        self.notify = notify
+
+        self.active = 0
+        self._queue: List[_ChatTicket] = []
+        self._seq = itertools.count()
+        self._buckets: Dict[str, List[float]] = {}  # rate key -> [tokens, updated_at]
+        self._service_time = 1.0  # EWMA of seconds per request
+        self.stats_counters = {"admitted": 0, "rate_limited": 0, "shed": 0, "expired": 0}
+
+    def _check_rate(self, client_id: str):
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(client_id, (self.client_burst, now))
+        tokens = min(self.client_burst, tokens + (now - updated) * self.client_rate)
+        if tokens < 1:
+            self._buckets[client_id] = [tokens, now]
+            self.stats_counters["rate_limited"] += 1
+            raise AdmissionRejected(
+                429,
+                f"Rate limit exceeded for client {client_id}",
+                (1 - tokens) / self.client_rate,
+            )
+        self._buckets[client_id] = [tokens - 1, now]
+
+        # Drop idle full buckets so the table does not grow with every client ever seen
+        if len(self._buckets) > 4096:
+            self._buckets = {
+                cid: bucket
+                for cid, bucket in self._buckets.items()
+                if bucket[0] + (now - bucket[1]) * self.client_rate < self.client_burst
+            }
+
+    def _estimated_wait(self, position: int) -> float:
+        return self._service_time * (position // self.max_concurrent + 1)
+
+    async def acquire(
+        self,
+        client_id: Optional[str] = None,
+        priority: int = 0,
+        rate_key: Optional[str] = None,
+    ):
+        """Wait for an execution slot; raises AdmissionRejected when shedding load
+
+        Rate limits apply per ``rate_key`` (the caller's address); ``client_id``
+        only routes queue position updates and never affects the limit.
+        """
+        if rate_key is not None and self.client_rate is not None:
+            self._check_rate(rate_key)
+        priority = max(0, min(int(priority), self.max_priority))
+
+        if self.active < self.max_concurrent and not self._queue:
+            self.active += 1
+            self.stats_counters["admitted"] += 1
+            return
+
+        if len(self._queue) >= self.max_queue:
+            self.stats_counters["shed"] += 1
+            raise AdmissionRejected(
+                503, "Chat queue is full", self._estimated_wait(len(self._queue))
+            )
+
+        ticket = _ChatTicket(
+            sort_key=(-priority, next(self._seq)),
+            client_id=client_id,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, ticket)
+        self._report_positions()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if ticket.future.done():
+                # Slot was handed over just as the deadline passed; keep it
+                return
+            ticket.future.cancel()
+            self._remove(ticket)
+            self.stats_counters["expired"] += 1
+            raise AdmissionRejected(
+                503,
+                "Chat request expired in queue",
+                self._estimated_wait(len(self._queue)),
+            )
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release(0.0)
+            else:
+                ticket.future.cancel()
+                self._remove(ticket)
+            raise
+
+    def release(self, service_time: Optional[float] = None):
+        """Free a slot and hand it to the highest-priority queued request"""
+        if service_time:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        self.active -= 1
+
+        while self._queue and self.active < self.max_concurrent:
+            ticket = heapq.heappop(self._queue)
+            if ticket.future.done():
+                continue
+            self.active += 1
+            self.stats_counters["admitted"] += 1
+            ticket.future.set_result(True)
+        self._report_positions()
+
+    def _remove(self, ticket: _ChatTicket):
+        try:
+            self._queue.remove(ticket)
+        except ValueError:
+            return
+        heapq.heapify(self._queue)
+        self._report_positions()
+
+    def _report_positions(self):
+        if not self.notify:
+            return
+        waiting = [t for t in sorted(self._queue) if not t.future.done()]
+        for position, ticket in enumerate(waiting, start=1):
+            if ticket.client_id is None:
+                continue
+            asyncio.create_task(
+                self.notify(
+                    ticket.client_id,
+                    {
+                        "type": "chat_queue",
+                        "data": {
+                            "position": position,
+                            "queue_length": len(waiting),
+                            "estimated_wait": self._estimated_wait(position - 1),
+                        },
+                    },
+                )
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": len(self._queue),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "service_time": self._service_time,
+            **self.stats_counters,
+        }
+
+
+# Fallback inventory for hosts without a readable PCI sysfs tree
+SIMULATED_HARDWARE: List[Dict[str, Any]] = [
+    {
+        "name": "Quantum Resonance Network Card",
+        "type": "network",
+        "vendor_id": "0x8086",
+        "device_id": "0x15b7",
+        "signature": "qrn_intel_eth_15b7",
+        "driver_loaded": False,
+        "description": "High-frequency quantum entanglement network interface",
+    },
+    {
+        "name": "Neural Processing Accelerator",
+        "type": "compute",
+        "vendor_id": "0x10de",
+        "device_id": "0x2684",
+        "signature": "npa_nvidia_cuda_2684",
+        "driver_loaded": False,
+        "description": "Consciousness-aware parallel processing unit",
+    },
+    {
+        "name": "Temporal Storage Matrix",
+        "type": "storage",
+        "vendor_id": "0x1022",
+        "device_id": "0x7901",
+        "signature": "tsm_amd_nvme_7901",
+        "driver_loaded": True,
+        "description": "Non-linear time-dimensional storage device",
+    },
+]
+
+# PCI base class code -> hardware type
+PCI_CLASS_TYPES = {
+    0x01: "storage",
+    0x02: "network",
+    0x03: "display",
+    0x04: "multimedia",
+    0x05: "memory",
+    0x06: "bridge",
+    0x07: "communication",
+    0x08: "system",
+    0x09: "input",
+    0x0B: "compute",
+    0x0C: "serial",
+    0x0D: "wireless",
+    0x10: "crypto",
+    0x12: "compute",
+}
+
+
+class HardwareInventory:
+    """Cached PCI inventory read from sysfs, refreshed incrementally by mtime"""
+
+    def __init__(
+        self,
+        root: str = "/sys/bus/pci/devices",
+        min_refresh_interval: float = 1.0,
+        full_rescan_interval: float = 300.0,
+    ):
+        self.root = Path(root)
+        self.min_refresh_interval = min_refresh_interval
+        self.full_rescan_interval = full_rescan_interval
+
+        self.simulated = False
+        self._devices: Dict[str, Dict[str, Any]] = {}  # PCI address -> device
+        self._mtimes: Dict[str, float] = {}  # PCI address -> device dir mtime
+        self._root_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._full_scan_at = 0.0
+        self._snapshot: List[Dict[str, Any]] = []
+        self.by_signature: Dict[str, Dict[str, Any]] = {}
+        self.by_id: Dict[tuple, List[Dict[str, Any]]] = {}  # (vendor, device) -> devices
+
+    @staticmethod
+    def _read(path: Path) -> str:
+        try:
+            return path.read_text().strip()
+        except OSError:
+            return ""
+
+    def _read_device(self, address: str) -> Dict[str, Any]:
+        path = self.root / address
+        vendor_id = self._read(path / "vendor")
+        device_id = self._read(path / "device")
+        class_code = self._read(path / "class")
+        try:
+            hw_type = PCI_CLASS_TYPES.get(int(class_code, 16) >> 16, "other")
+        except ValueError:
+            hw_type = "other"
+        driver_link = path / "driver"
+        driver = os.path.basename(os.readlink(driver_link)) if driver_link.is_symlink() else None
+        slot = address.replace(":", "_").replace(".", "_")
+
+        return {
+            "name": f"PCI {hw_type} device {vendor_id}:{device_id}",
+            "type": hw_type,
+            "vendor_id": vendor_id,
+            "device_id": device_id,
+            "signature": f"{hw_type}_{vendor_id[2:]}_{device_id[2:]}_{slot}",
+            "driver_loaded": driver is not None,
+            "driver": driver,
+            "address": address,
+            "description": f"PCI class {class_code} at {address}",
+        }
+
+    def _rebuild_indexes(self):
+        devices = sorted(self._devices.values(), key=lambda d: d.get("address", ""))
+        self._snapshot = devices
+        self.by_signature = {d["signature"]: d for d in devices}
+        self.by_id = {}
+        for device in devices:
+            self.by_id.setdefault((device["vendor_id"], device["device_id"]), []).append(device)
+
+    def _use_simulated(self):
+        if not self.simulated:
+            self.simulated = True
+            self._devices = {d["signature"]: dict(d) for d in SIMULATED_HARDWARE}
+            self._mtimes = {}
+            self._rebuild_indexes()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Bring the cache up to date; returns True when the inventory changed"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.min_refresh_interval:
+            return False
+        self._checked_at = now
+
+        try:
+            root_mtime = self.root.stat().st_mtime
+            entries = os.listdir(self.root) if root_mtime != self._root_mtime or force else None
+        except OSError:
+            self._use_simulated()
+            return False
+
+        full = force or now - self._full_scan_at >= self.full_rescan_interval
+        if full:
+            self._full_scan_at = now
+        if entries is None:
+            entries = self._mtimes.keys()
+        elif not entries:
+            self._use_simulated()
+            return False
+        self._root_mtime = root_mtime
+
+        if self.simulated:
+            self.simulated = False
+            self._devices = {}
+
+        changed = False
+        current = set(entries)
+        for address in list(self._devices):
+            if address not in current:
+                del self._devices[address]
+                self._mtimes.pop(address, None)
+                changed = True
+
+        for address in current:
+            try:
+                mtime = (self.root / address).stat().st_mtime
+            except OSError:
+                continue
+            if full or self._mtimes.get(address) != mtime:
+                device = self._read_device(address)
+                self._mtimes[address] = mtime
+                if self._devices.get(address) != device:
+                    self._devices[address] = device
+                    changed = True
+
+        if changed:
+            self._rebuild_indexes()
+        return changed
+
+    def devices(self) -> List[Dict[str, Any]]:
+        self.refresh()
+        return self._snapshot
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        self.refresh()
+        return self.by_signature.get(signature)
+
+    def find(self, vendor_id: str, device_id: str) -> List[Dict[str, Any]]:
+        self.refresh()
+        return self.by_id.get((vendor_id, device_id), [])
+
+
+# Driver lifecycle states and the transitions allowed between them
+DRIVER_UNLOADED = "unloaded"
+DRIVER_LOADING = "loading"
+DRIVER_ACTIVE = "active"
+DRIVER_UNLOADING = "unloading"
+DRIVER_FAILED = "failed"
+
+DRIVER_TRANSITIONS: Dict[str, Set[str]] = {
+    DRIVER_UNLOADED: {DRIVER_LOADING},
+    DRIVER_LOADING: {DRIVER_ACTIVE, DRIVER_FAILED},
+    DRIVER_ACTIVE: {DRIVER_UNLOADING},
+    DRIVER_UNLOADING: {DRIVER_UNLOADED, DRIVER_ACTIVE},
+    DRIVER_FAILED: {DRIVER_LOADING, DRIVER_UNLOADED},
+}
+
+
 class DriverManager:
     """Manages dynamic driver loading and kernel module interaction"""
 
-    def __init__(self, kernel_comm: KernelCommunicator):
+    def __init__(
+        self,
+        kernel_comm: KernelCommunicator,
+        inventory: Optional[HardwareInventory] = None,
+    ):
         self.kernel_comm = kernel_comm
+        self.inventory = inventory or HardwareInventory()
         self.loaded_drivers: Dict[str, Dict[str, Any]] = {}
-        self.hardware_signatures: Dict[str, str] = {}
+        self.hardware_signatures: Dict[str, Dict[str, Any]] = {}
+        self.driver_states: Dict[str, str] = {}  # signature -> DRIVER_* state
+        self._load_counts: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # signature -> (action, task) of the most recently queued operation
+        self._inflight: Dict[str, tuple] = {}
 
     async def scan_hardware(self) -> List[Dict[str, Any]]:
-        """Simulate hardware detection and return hardware list"""
-        # This would normally interface with actual hardware detection
-        # For emulation, we generate realistic hardware signatures
-        simulated_hardware = [
-            {
-                "name": "Quantum Resonance Network Card",
-                "type": "network",
-                "vendor_id": "0x8086",
-                "device_id": "0x15b7",
-                "signature": "qrn_intel_eth_15b7",
-                "driver_loaded": False,
-                "description": "High-frequency quantum entanglement network interface",
-            },
-            {
-                "name": "Neural Processing Accelerator",
-                "type": "compute",
-                "vendor_id": "0x10de",
-                "device_id": "0x2684",
-                "signature": "npa_nvidia_cuda_2684",
-                "driver_loaded": False,
-                "description": "Consciousness-aware parallel processing unit",
-            },
-            {
-                "name": "Temporal Storage Matrix",
-                "type": "storage",
-                "vendor_id": "0x1022",
-                "device_id": "0x7901",
-                "signature": "tsm_amd_nvme_7901",
-                "driver_loaded": True,
-                "description": "Non-linear time-dimensional storage device",
-            },
+        """Return the cached hardware inventory with driver state applied"""
+        hardware = self.inventory.devices()
+        self.hardware_signatures = self.inventory.by_signature
+
+        if not self.driver_states:
+            return hardware
+        return [
+            {**device, "driver_loaded": self.driver_states[device["signature"]] == DRIVER_ACTIVE}
+            if device["signature"] in self.driver_states
+            else device
+            for device in hardware
         ]
 
-        return simulated_hardware
+    def driver_state(self, hardware_signature: str) -> str:
+        state = self.driver_states.get(hardware_signature)
+        if state is not None:
+            return state
+        # Drivers already bound before EchoDaemon started are reported by sysfs
+        device = self.inventory.get(hardware_signature)
+        return DRIVER_ACTIVE if device and device.get("driver_loaded") else DRIVER_UNLOADED
+
+    def _transition(self, hardware_signature: str, state: str):
+        current = self.driver_state(hardware_signature)
+        if state not in DRIVER_TRANSITIONS[current]:
+            raise ValueError(f"Invalid driver transition {current} -> {state}")
+        # Kept explicitly so it overrides a stale driver_loaded flag from the inventory
+        self.driver_states[hardware_signature] = state
+
+    def _lock(self, hardware_signature: str) -> asyncio.Lock:
+        lock = self._locks.get(hardware_signature)
+        if lock is None:
+            lock = self._locks[hardware_signature] = asyncio.Lock()
+        return lock
+
+    async def _schedule(self, action: str, hardware_signature: str) -> Dict[str, Any]:
+        """Run one driver operation, joining the latest queued one if it is the same action
+
+        Joining is only safe with the most recent operation for a signature:
+        once a different action is queued behind it, its result is stale.
+        """
+        latest = self._inflight.get(hardware_signature)
+        if latest is not None and latest[0] == action and not latest[1].done():
+            task = latest[1]
+        else:
+            operation = self._load if action == "load" else self._unload
+            task = asyncio.ensure_future(self._locked(operation, hardware_signature))
+            entry = (action, task)
+            self._inflight[hardware_signature] = entry
+
+            def forget(_):
+                if self._inflight.get(hardware_signature) is entry:
+                    del self._inflight[hardware_signature]
+
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
+
+    async def _locked(self, operation, hardware_signature: str) -> Dict[str, Any]:
+        async with self._lock(hardware_signature):
+            return await operation(hardware_signature)
 
     async def load_driver(self, hardware_signature: str) -> Dict[str, Any]:
         """Load a driver for specific hardware"""
+        return await self._schedule("load", hardware_signature)
+
+    async def unload_driver(self, hardware_signature: str) -> Dict[str, Any]:
+        """Unload a driver"""
+        return await self._schedule("unload", hardware_signature)
+
+    async def bulk(
+        self, action: str, hardware_signatures: List[str], max_parallel: int = 32
+    ) -> List[Dict[str, Any]]:
+        """Apply one action to many signatures in parallel, one result per signature"""
+        if action not in ("load", "unload"):
+            raise ValueError(f"Invalid driver action: {action}")
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def run(signature: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._schedule(action, signature)
+
+        return await asyncio.gather(*(run(sig) for sig in hardware_signatures))
+
+    async def _load(self, hardware_signature: str) -> Dict[str, Any]:
+        state = self.driver_state(hardware_signature)
+        if state == DRIVER_ACTIVE:
+            return {
+                "success": True,
+                "message": f"Driver {hardware_signature} already loaded",
+                "signature": hardware_signature,
+                "state": state,
+            }
+        if DRIVER_LOADING not in DRIVER_TRANSITIONS[state]:
+            return {
+                "success": False,
+                "message": f"Cannot load driver {hardware_signature} while {state}",
+                "signature": hardware_signature,
+                "state": state,
+            }
+
+        self._transition(hardware_signature, DRIVER_LOADING)
         try:
             # Send module load command to kernel
             success = await self.kernel_comm.send_command(
@@ -378,72 +939,344 @@ class DriverManager:
             )
 
             if success:
+                self._transition(hardware_signature, DRIVER_ACTIVE)
                 self.loaded_drivers[hardware_signature] = {
                     "loaded_at": time.time(),
-                    "status": "active",
-                    "load_count": self.loaded_drivers.get(hardware_signature, {}).get(
-                        "load_count", 0
-                    )
-                    + 1,
+                    "status": DRIVER_ACTIVE,
+                    "load_count": self._load_counts.get(hardware_signature, 0) + 1,
                 }
+                self._load_counts[hardware_signature] = self.loaded_drivers[
+                    hardware_signature
+                ]["load_count"]
 
                 return {
                     "success": True,
                     "message": f"Driver {hardware_signature} loaded successfully",
                     "signature": hardware_signature,
+                    "state": DRIVER_ACTIVE,
                 }
             else:
+                self._transition(hardware_signature, DRIVER_FAILED)
                 return {
                     "success": False,
                     "message": f"Failed to communicate with kernel for driver {hardware_signature}",
                     "signature": hardware_signature,
+                    "state": DRIVER_FAILED,
                 }
 
         except Exception as e:
-            logging.error(f"Driver load failed: {e}")
+            logging.error("Driver load failed: %s", e)
+            self._transition(hardware_signature, DRIVER_FAILED)
             return {
                 "success": False,
                 "message": f"Driver load error: {str(e)}",
                 "signature": hardware_signature,
+                "state": DRIVER_FAILED,
             }
 
-    async def unload_driver(self, hardware_signature: str) -> Dict[str, Any]:
-        """Unload a driver"""
+    async def _unload(self, hardware_signature: str) -> Dict[str, Any]:
+        state = self.driver_state(hardware_signature)
+        if state == DRIVER_FAILED:
+            # Nothing was inserted; just clear the failure
+            self._transition(hardware_signature, DRIVER_UNLOADED)
+            return {
+                "success": True,
+                "message": f"Driver {hardware_signature} reset after failed load",
+                "signature": hardware_signature,
+                "state": DRIVER_UNLOADED,
+            }
+        if DRIVER_UNLOADING not in DRIVER_TRANSITIONS[state]:
+            return {
+                "success": False,
+                "message": f"Failed to unload driver {hardware_signature}: driver is {state}",
+                "signature": hardware_signature,
+                "state": state,
+            }
+
+        self._transition(hardware_signature, DRIVER_UNLOADING)
         try:
             success = await self.kernel_comm.send_command(
                 f"rmmod driver_{hardware_signature}"
             )
 
-            if success and hardware_signature in self.loaded_drivers:
-                del self.loaded_drivers[hardware_signature]
+            if success:
+                self._transition(hardware_signature, DRIVER_UNLOADED)
+                self.loaded_drivers.pop(hardware_signature, None)
 
                 return {
                     "success": True,
                     "message": f"Driver {hardware_signature} unloaded successfully",
                     "signature": hardware_signature,
+                    "state": DRIVER_UNLOADED,
                 }
             else:
+                self._transition(hardware_signature, DRIVER_ACTIVE)
                 return {
                     "success": False,
                     "message": f"Failed to unload driver {hardware_signature}",
                     "signature": hardware_signature,
+                    "state": DRIVER_ACTIVE,
                 }
 
         except Exception as e:
-            logging.error(f"Driver unload failed: {e}")
+            logging.error("Driver unload failed: %s", e)
+            self._transition(hardware_signature, DRIVER_ACTIVE)
             return {
                 "success": False,
                 "message": f"Driver unload error: {str(e)}",
                 "signature": hardware_signature,
+                "state": DRIVER_ACTIVE,
             }
 
 
+METRIC_FIELDS = (
+    "cpu_usage",
+    "memory_usage",
+    "disk_usage",
+    "active_processes",
+    "bytes_sent_per_sec",
+    "bytes_recv_per_sec",
+)
+
+
+def _json_number(value: float) -> Optional[float]:
+    """NaN marks a missing value; JSON has no NaN, so it is served as null"""
+    return None if math.isnan(value) else value
+
+
+class MetricSeries:
+    """Fixed-capacity ring of samples stored column-wise in ``array('d')`` buffers
+
+    Each field keeps ``min``, ``max`` and ``avg`` columns; raw samples share
+    one column for all three.
+    """
+
+    def __init__(self, fields, capacity: int, rollup: bool = True):
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.rollup = rollup
+        self.times = array("d", bytes(8 * capacity))
+        stats = ("min", "max", "avg") if rollup else ("avg",)
+        self.columns = {
+            (name, stat): array("d", bytes(8 * capacity))
+            for name in self.fields
+            for stat in stats
+        }
+        self.size = 0
+        self._head = 0  # next write position
+
+    def _index(self, i: int) -> int:
+        """Ring position of the i-th oldest sample"""
+        return (self._head - self.size + i) % self.capacity
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> float:
+        # Lets bisect search timestamps in logical (oldest-first) order
+        return self.times[self._index(i)]
+
+    def append(self, ts: float, values: Dict[str, tuple]):
+        """Add a sample; ``values`` maps field -> (min, max, avg) or a single value"""
+        pos = self._head
+        self.times[pos] = ts
+        for name in self.fields:
+            value = values.get(name, 0.0)
+            if self.rollup:
+                lo, hi, avg = value
+                self.columns[(name, "min")][pos] = lo
+                self.columns[(name, "max")][pos] = hi
+                self.columns[(name, "avg")][pos] = avg
+            else:
+                self.columns[(name, "avg")][pos] = value
+        self._head = (pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    @property
+    def oldest(self) -> Optional[float]:
+        return self[0] if self.size else None
+
+    def query(self, start: float, end: float, max_points: Optional[int] = None) -> Dict[str, Any]:
+        lo = bisect.bisect_left(self, start)
+        hi = bisect.bisect_right(self, end)
+        positions = [self._index(i) for i in range(lo, hi)]
+        if max_points and len(positions) > max_points:
+            # Keep the newest point and thin evenly from there
+            step = math.ceil(len(positions) / max_points)
+            positions = positions[::-1][::step][::-1]
+        result: Dict[str, Any] = {"time": [self.times[p] for p in positions]}
+        for name in self.fields:
+            if self.rollup:
+                result[name] = {
+                    stat: [_json_number(self.columns[(name, stat)][p]) for p in positions]
+                    for stat in ("min", "max", "avg")
+                }
+            else:
+                column = [_json_number(self.columns[(name, "avg")][p]) for p in positions]
+                result[name] = {"min": column, "max": list(column), "avg": list(column)}
+        return result
+
+
+class _Bucket:
+    """Running min/max/sum/count per field for the rollup in progress
+
+    Counts are kept per field so NaN (no value) samples are skipped rather
+    than averaged in.
+    """
+
+    def __init__(self, start: float, fields):
+        self.start = start
+        self.stats = {name: [math.inf, -math.inf, 0.0, 0] for name in fields}
+
+    def add(self, values: Dict[str, float]):
+        for name, value in values.items():
+            if math.isnan(value):
+                continue
+            stat = self.stats[name]
+            stat[0] = min(stat[0], value)
+            stat[1] = max(stat[1], value)
+            stat[2] += value
+            stat[3] += 1
+
+    def merge(self, other: "_Bucket"):
+        for name, (lo, hi, total, count) in other.stats.items():
+            stat = self.stats[name]
+            stat[0] = min(stat[0], lo)
+            stat[1] = max(stat[1], hi)
+            stat[2] += total
+            stat[3] += count
+
+    def summary(self) -> Dict[str, tuple]:
+        return {
+            name: (lo, hi, total / count) if count else (math.nan, math.nan, math.nan)
+            for name, (lo, hi, total, count) in self.stats.items()
+        }
+
+
+class MetricsHistory:
+    """Raw samples rolled up into 1-minute and 1-hour min/max/avg series
+
+    Every tier is a fixed-size ring, so retention and memory are bounded:
+    by default one hour of 5-second samples, two days of minutes and thirty
+    days of hours.  Missing values are stored as NaN and left out of rollups.
+    """
+
+    RESOLUTIONS = {"raw": 0, "1m": 60, "1h": 3600}
+
+    def __init__(
+        self,
+        fields=METRIC_FIELDS,
+        raw_capacity: int = 720,
+        minute_capacity: int = 2880,
+        hour_capacity: int = 720,
+    ):
+        self.fields = tuple(fields)
+        self.tiers = {
+            "raw": MetricSeries(self.fields, raw_capacity, rollup=False),
+            "1m": MetricSeries(self.fields, minute_capacity),
+            "1h": MetricSeries(self.fields, hour_capacity),
+        }
+        self._minute: Optional[_Bucket] = None
+        self._hour: Optional[_Bucket] = None
+        self._lock = threading.Lock()
+
+    def record(self, ts: float, values: Dict[str, float]):
+        values = {name: float(values.get(name, math.nan)) for name in self.fields}
+        with self._lock:
+            self.tiers["raw"].append(ts, values)
+
+            minute_start = ts - ts % 60
+            if self._minute is not None and self._minute.start != minute_start:
+                self._close_minute()
+            if self._minute is None:
+                self._minute = _Bucket(minute_start, self.fields)
+            self._minute.add(values)
+
+    def _close_minute(self):
+        bucket, self._minute = self._minute, None
+        self.tiers["1m"].append(bucket.start, bucket.summary())
+
+        hour_start = bucket.start - bucket.start % 3600
+        if self._hour is not None and self._hour.start != hour_start:
+            hour, self._hour = self._hour, None
+            self.tiers["1h"].append(hour.start, hour.summary())
+        if self._hour is None:
+            self._hour = _Bucket(hour_start, self.fields)
+        self._hour.merge(bucket)
+
+    def _open_buckets(self, resolution: str) -> List[_Bucket]:
+        """Rollups still being filled for ``resolution``, oldest first"""
+        if resolution == "1m":
+            return [self._minute] if self._minute else []
+        if self._minute is None:
+            return [self._hour] if self._hour else []
+        # The open hour only closes once a minute of the next hour closes
+        current = _Bucket(self._minute.start - self._minute.start % 3600, self.fields)
+        buckets = []
+        if self._hour is not None:
+            if self._hour.start == current.start:
+                current.merge(self._hour)
+            else:
+                buckets.append(self._hour)
+        current.merge(self._minute)
+        return buckets + [current]
+
+    def pick_resolution(self, start: float, end: float, max_points: int) -> str:
+        """Finest tier that covers ``start`` within ``max_points``
+
+        When no tier reaches back that far (history younger than the range),
+        the finest tier holding the oldest data wins.
+        """
+        fitting = []
+        for name in self.RESOLUTIONS:
+            series = self.tiers[name]
+            points = bisect.bisect_right(series, end) - bisect.bisect_left(series, start)
+            if series.size and points <= max_points:
+                fitting.append(name)
+        if not fitting:
+            return "1h"
+        for name in fitting:
+            if self.tiers[name].oldest <= start:
+                return name
+        return min(fitting, key=lambda name: self.tiers[name].oldest)
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        resolution: Optional[str] = None,
+        max_points: int = 1000,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            resolution = resolution or self.pick_resolution(start, end, max_points)
+            series = self.tiers[resolution]
+            open_buckets = [
+                bucket
+                for bucket in (self._open_buckets(resolution) if resolution != "raw" else [])
+                if start <= bucket.start <= end
+            ]
+
+            result = series.query(start, end, max(1, max_points - len(open_buckets)))
+            # Partial rollups so recent samples show up before their bucket closes
+            for bucket in open_buckets:
+                result["time"].append(bucket.start)
+                for name, (lo, hi, avg) in bucket.summary().items():
+                    for stat, value in (("min", lo), ("max", hi), ("avg", avg)):
+                        result[name][stat].append(_json_number(value))
+            return {"resolution": resolution, "start": start, "end": end, **result}
+
+    def stats(self) -> Dict[str, int]:
+        return {name: len(series) for name, series in self.tiers.items()}
+
+
 class SystemMonitor:
     """Monitors system metrics and kernel events"""
 
-    def __init__(self):
+    def __init__(self, history: Optional[MetricsHistory] = None):
         self.kernel_events: List[KernelEvent] = []
         self.max_events = 100
+        self.history = history or MetricsHistory()
+        self._last_network: Optional[tuple] = None  # (timestamp, bytes_sent, bytes_recv)
 
     def get_system_metrics(self) -> SystemMetrics:
         """Collect current system metrics"""
@@ -475,7 +1308,7 @@ class SystemMonitor:
             )
 
         except Exception as e:
-            logging.error(f"Failed to collect system metrics: {e}")
+            logging.error("Failed to collect system metrics: %s", e)
             return SystemMetrics(
                 cpu_usage=0.0,
                 memory_usage=0.0,
@@ -483,8 +1316,34 @@ class SystemMonitor:
                 disk_usage=0.0,
                 active_processes=0,
                 kernel_events=[],
+                collected=False,
             )
 
+    def record(self, metrics: SystemMetrics, ts: Optional[float] = None):
+        """Append a sample to the metrics history; network counters become rates
+
+        Failed collections are skipped, and rates are left out until a
+        previous counter reading exists.
+        """
+        if not metrics.collected:
+            return
+        ts = time.time() if ts is None else ts
+        values = {
+            "cpu_usage": metrics.cpu_usage,
+            "memory_usage": metrics.memory_usage,
+            "disk_usage": metrics.disk_usage,
+            "active_processes": metrics.active_processes,
+        }
+        sent = metrics.network_activity.get("bytes_sent")
+        recv = metrics.network_activity.get("bytes_recv")
+        if sent is not None and recv is not None:
+            if self._last_network and ts > self._last_network[0]:
+                elapsed = ts - self._last_network[0]
+                values["bytes_sent_per_sec"] = max(0, sent - self._last_network[1]) / elapsed
+                values["bytes_recv_per_sec"] = max(0, recv - self._last_network[2]) / elapsed
+            self._last_network = (ts, sent, recv)
+        self.history.record(ts, values)
+
     def add_kernel_event(self, event: KernelEvent):
         """Add a kernel event to the history"""
         self.kernel_events.append(event)
@@ -495,9 +1354,26 @@ class SystemMonitor:
 # Global instances
 connection_manager = ConnectionManager()
 kernel_comm = KernelCommunicator()
-ai_core = AICore()
+continuity_store = ContinuityStore() if ContinuityStore else None
+persona_registry = (
+    PersonaRegistry(base_prompt=CODEX_SYSTEM_PROMPT) if PersonaRegistry else None
+)
+ai_core = AICore(memory_store=continuity_store, persona_registry=persona_registry)
 driver_manager = DriverManager(kernel_comm)
 system_monitor = SystemMonitor()
+chat_admission = ChatAdmissionController(notify=connection_manager.send_to_client)
+
+MATHEMAGIC_MODEL_PATH = Path(__file__).resolve().parent / "models" / "mathemagic_index.npz"
+mathemagic_service = (
+    MathemagicModelService(MATHEMAGIC_MODEL_PATH)
+    if MathemagicModelService
+    else None
+)
+
+classifier_service = ClassifierService() if ClassifierService else None
+classify_batcher = (
+    MicroBatcher(classifier_service.classify_batch) if classifier_service else None
+)
 
 # Redis for pub/sub messaging
 try:
@@ -505,7 +1381,7 @@ try:
     redis_client.ping()  # Test connection
     logging.info("Connected to Redis message bus")
 except Exception as e:
-    logging.warning(f"Redis not available: {e}")
+    logging.warning("Redis not available: %s", e)
     redis_client = None
 
 
@@ -556,44 +1432,54 @@ async def serve_frontend():
     return FileResponse(FRONTEND_DIR / "index.html")
 
 
+def parse_kernel_line(line: str) -> Optional[KernelEvent]:
+    """Parse a ``[timestamp][SOURCE] message`` line emitted by the kernel daemon"""
+    if not line.strip() or not line.startswith("["):
+        return None
+
+    parts = line.split("]", 2)
+    if len(parts) < 3:
+        return None
+
+    return KernelEvent(
+        timestamp=float(parts[0][1:]),
+        level="INFO",
+        source=parts[1][1:],
+        message=parts[2].strip(),
+    )
+
+
+async def process_kernel_data(event_data: str):
+    """Record and broadcast every kernel event contained in a received chunk"""
+    for line in event_data.split("\n"):
+        try:
+            event = parse_kernel_line(line)
+            if event is None:
+                continue
+
+            system_monitor.add_kernel_event(event)
+
+            # Broadcast to connected clients
+            await connection_manager.broadcast(
+                {"type": "kernel_event", "data": asdict(event)}
+            )
+
+        except Exception as e:
+            logging.error("Failed to parse kernel event: %s", e)
+
+
 # Background task to listen for kernel events
-async def kernel_event_listener():
+async def kernel_event_listener(comm: Optional[KernelCommunicator] = None):
     """Background task to continuously listen for kernel events"""
+    comm = comm or kernel_comm
     while True:
         try:
-            event_data = await kernel_comm.receive_events()
+            event_data = await comm.receive_events()
             if event_data:
-                # Parse kernel event
-                lines = event_data.split("\n")
-                for line in lines:
-                    if line.strip() and line.startswith("["):
-                        try:
-                            # Parse format: [timestamp][KERNEL] message
-                            parts = line.split("]", 2)
-                            if len(parts) >= 3:
-                                timestamp = float(parts[0][1:])
-                                source = parts[1][1:]
-                                message = parts[2].strip()
-
-                                event = KernelEvent(
-                                    timestamp=timestamp,
-                                    level="INFO",
-                                    source=source,
-                                    message=message,
-                                )
-
-                                system_monitor.add_kernel_event(event)
-
-                                # Broadcast to connected clients
-                                await connection_manager.broadcast(
-                                    {"type": "kernel_event", "data": asdict(event)}
-                                )
-
-                        except Exception as e:
-                            logging.error(f"Failed to parse kernel event: {e}")
+                await process_kernel_data(event_data)
 
         except Exception as e:
-            logging.error(f"Kernel event listener error: {e}")
+            logging.error("Kernel event listener error: %s", e)
 
         await asyncio.sleep(0.1)
 
@@ -603,12 +1489,13 @@ async def system_metrics_broadcaster():
     """Background task to periodically broadcast system metrics"""
     while True:
         try:
-            metrics = system_monitor.get_system_metrics()
+            metrics = await asyncio.to_thread(system_monitor.get_system_metrics)
+            system_monitor.record(metrics)
             await connection_manager.broadcast(
                 {"type": "system_metrics", "data": asdict(metrics)}
             )
         except Exception as e:
-            logging.error(f"Metrics broadcaster error: {e}")
+            logging.error("Metrics broadcaster error: %s", e)
 
         await asyncio.sleep(5)  # Update every 5 seconds
 
@@ -617,6 +1504,9 @@ async def system_metrics_broadcaster():
 class ChatMessage(BaseModel):
     message: str
     context: Optional[Dict[str, Any]] = None
+    client_id: Optional[str] = None  # WebSocket client id for queue updates
+    priority: int = 0  # higher is served first; clamped to 0..5
+    persona: Optional[str] = None  # continuity persona; the default persona when omitted
 
 
 class DriverAction(BaseModel):
@@ -624,10 +1514,24 @@ class DriverAction(BaseModel):
     hardware_signature: str
 
 
+class BulkDriverAction(BaseModel):
+    action: str  # "load" or "unload"
+    hardware_signatures: List[str]
+
+
 class KernelCommand(BaseModel):
     command: str
 
 
+class ClassifyRequest(BaseModel):
+    texts: List[str]
+
+
+class MathemagicQuery(BaseModel):
+    prompts: List[str]
+    k: int = Field(1, ge=1, le=50)  # number of snippets to return per prompt
+
+
 # WebSocket endpoint for real-time communication
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
@@ -653,18 +1557,36 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
 
 # REST API Endpoints
 @app.post("/api/chat")
-async def chat_with_ai(message: ChatMessage):
+async def chat_with_ai(message: ChatMessage, request: Request):
     """Send message to AI and get response"""
+    if message.persona and (persona_registry is None or message.persona not in persona_registry):
+        raise HTTPException(status_code=400, detail=f"Unknown persona: {message.persona}")
+
+    try:
+        # Rate limit by peer address; client_id is caller-chosen and only used for queue updates
+        peer = request.client.host if request.client else "unknown"
+        await chat_admission.acquire(message.client_id, message.priority, rate_key=peer)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
+
+    start_time = time.time()
     try:
         # Get current system context
+        metrics = await asyncio.to_thread(system_monitor.get_system_metrics)
         context = {
-            "system_metrics": asdict(system_monitor.get_system_metrics()),
+            "system_metrics": asdict(metrics),
             "kernel_events": [
                 asdict(event) for event in system_monitor.kernel_events[-5:]
             ],
         }
 
-        response = await ai_core.generate_response(message.message, context)
+        response = await ai_core.generate_response(
+            message.message, context, persona=message.persona
+        )
 
         # Broadcast AI response to all connected clients
         await connection_manager.broadcast(
@@ -674,8 +1596,10 @@ async def chat_with_ai(message: ChatMessage):
         return asdict(response)
 
     except Exception as e:
-        logging.error(f"Chat API error: {e}")
+        logging.error("Chat API error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        chat_admission.release(time.time() - start_time)
 
 
 @app.get("/api/hardware")
@@ -685,7 +1609,7 @@ async def get_hardware():
         hardware = await driver_manager.scan_hardware()
         return {"hardware": hardware}
     except Exception as e:
-        logging.error(f"Hardware scan error: {e}")
+        logging.error("Hardware scan error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -706,7 +1630,135 @@ async def manage_driver(action: DriverAction):
         return result
 
     except Exception as e:
-        logging.error(f"Driver management error: {e}")
+        logging.error("Driver management error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/drivers/bulk")
+async def manage_drivers_bulk(action: BulkDriverAction):
+    """Load or unload many drivers in parallel"""
+    if action.action not in ("load", "unload"):
+        raise HTTPException(status_code=400, detail="Invalid action")
+
+    try:
+        results = await driver_manager.bulk(action.action, action.hardware_signatures)
+        summary = {
+            "action": action.action,
+            "succeeded": sum(1 for r in results if r["success"]),
+            "failed": sum(1 for r in results if not r["success"]),
+            "results": results,
+        }
+
+        # One broadcast for the whole batch instead of one per driver
+        await connection_manager.broadcast({"type": "driver_bulk_status", "data": summary})
+
+        return summary
+
+    except Exception as e:
+        logging.error("Bulk driver management error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/mathemagic")
+async def query_mathemagic(query: MathemagicQuery):
+    """Return the best code snippets for each prompt from the resident model"""
+    if mathemagic_service is None:
+        raise HTTPException(status_code=503, detail="Mathemagic model support not installed")
+    if not MATHEMAGIC_MODEL_PATH.exists() and not mathemagic_service.info()["loaded"]:
+        raise HTTPException(status_code=503, detail="Mathemagic model not trained")
+
+    try:
+        matches = await asyncio.to_thread(
+            mathemagic_service.search_batch, query.prompts, query.k
+        )
+        return {
+            "results": [
+                {
+                    "prompt": prompt,
+                    "code": found[0]["code"] if found else None,
+                    "matches": found,
+                }
+                for prompt, found in zip(query.prompts, matches)
+            ],
+            "model": mathemagic_service.info(),
+        }
+    except Exception as e:
+        logging.error("Mathemagic query error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/classify")
+async def classify_texts(request: ClassifyRequest):
+    """Classify texts; concurrent requests are micro-batched into one inference call"""
+    if classify_batcher is None:
+        raise HTTPException(status_code=503, detail="Classifier support not installed")
+    if not classifier_service.available:
+        raise HTTPException(status_code=503, detail="Classifier model not trained")
+
+    try:
+        results = await classify_batcher.submit(request.texts)
+        return {
+            "results": [
+                {"text": text, **result} for text, result in zip(request.texts, results)
+            ]
+        }
+    except Exception as e:
+        logging.error("Classification error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/metrics/history")
+async def get_metrics_history(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    window: float = 3600,
+    resolution: Optional[str] = None,
+    max_points: int = 1000,
+):
+    """Recorded system metrics for a time range, at raw, 1m or 1h resolution"""
+    if resolution is not None and resolution not in MetricsHistory.RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"resolution must be one of {', '.join(MetricsHistory.RESOLUTIONS)}",
+        )
+    end = time.time() if end is None else end
+    start = end - window if start is None else start
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    try:
+        return system_monitor.history.query(
+            start, end, resolution, max(1, min(max_points, 10000))
+        )
+    except Exception as e:
+        logging.error("Metrics history error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/personas")
+async def list_personas():
+    """List the compiled continuity personas"""
+    if persona_registry is None:
+        return {"personas": [], "default": None}
+    default = ai_core.resolve_persona()
+    return {
+        "personas": persona_registry.personas(),
+        "default": default.key if default else None,
+        "errors": persona_registry.errors,
+    }
+
+
+@app.get("/api/memory/search")
+async def search_memory(q: str, k: int = 5):
+    """Search the indexed continuity memories"""
+    if continuity_store is None:
+        raise HTTPException(status_code=503, detail="Continuity memory support not installed")
+
+    try:
+        results = await asyncio.to_thread(continuity_store.search, q, max(1, min(k, 50)))
+        return {"query": q, "results": results, "index": continuity_store.stats()}
+    except Exception as e:
+        logging.error("Memory search error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -717,7 +1769,7 @@ async def send_kernel_command(command: KernelCommand):
         success = await kernel_comm.send_command(command.command)
         return {"success": success, "command": command.command}
     except Exception as e:
-        logging.error(f"Kernel command error: {e}")
+        logging.error("Kernel command error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -734,9 +1786,13 @@ async def get_system_status():
             "kernel_connected": kernel_comm.connected,
             "active_connections": len(connection_manager.active_connections),
             "loaded_drivers": driver_manager.loaded_drivers,
+            "driver_states": driver_manager.driver_states,
+            "chat_queue": chat_admission.stats(),
+            "continuity": continuity_store.stats() if continuity_store else None,
+            "metrics_history": system_monitor.history.stats(),
         }
     except Exception as e:
-        logging.error(f"Status API error: {e}")
+        logging.error("Status API error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -746,19 +1802,130 @@ async def health_check():
     return {"status": "alive", "timestamp": time.time()}
 
 
-def setup_logging():
-    """Configure logging for the EchoDaemon"""
-    log_dir = Path(__file__).parent / "logs"
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for machine-readable log files"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        return json.dumps(entry, default=str)
+
+
+class RepeatSuppressionFilter(logging.Filter):
+    """Lets through at most ``burst`` records per message template every ``interval`` seconds
+
+    The first record after a window with drops carries the drop count in its
+    ``suppressed`` attribute, so floods stay visible without hitting the disk.
+    """
+
+    def __init__(self, burst: int = 5, interval: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[tuple, List[float]] = {}  # key -> [window_start, passed, dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        key = (record.name, record.levelno, record.pathname, record.lineno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                dropped = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if dropped:
+                    record.suppressed = int(dropped)
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background log writer"""
+    global log_listener
+    if log_listener is None:
+        return
+    listener, log_listener = log_listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logging(
+    log_dir: Optional[Path] = None,
+    level: int = logging.INFO,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    queue_size: int = 10000,
+) -> logging.handlers.QueueListener:
+    """Configure logging for the EchoDaemon
+
+    Callers only enqueue records; a background listener thread formats them
+    and writes JSON lines to a size-rotated file plus plain text to stderr.
+    """
+    global log_listener
+    shutdown_logging()
+    log_dir = Path(log_dir) if log_dir else Path(__file__).parent / "logs"
     log_dir.mkdir(exist_ok=True)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - EchoDaemon - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_dir / "echodaemon.log"),
-            logging.StreamHandler(),
-        ],
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "echodaemon.log", maxBytes=max_bytes, backupCount=backup_count
+    )
+    file_handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s - EchoDaemon - %(levelname)s - %(message)s")
+    )
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RepeatSuppressionFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    log_listener = listener
+    return listener
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""Persona registry built from ``continuity/personas/*.yaml``.
+
+Each manifest is parsed once and compiled into a ready-to-send system prompt,
+its Llama 3 system block and (when a tokenizer is supplied) its token ids.
+The directory is polled at most every ``check_interval`` seconds and only
+changed files are re-parsed, so picking a persona per request is a dict
+lookup.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from memory.store import CONTINUITY_DIR, estimate_tokens
+
+PERSONA_DIR = CONTINUITY_DIR / "personas"
+
+
+def llama3_system_block(prompt: str) -> str:
+    return f"<|start_header_id|>system<|end_header_id|>\n{prompt}<|eot_id|>"
+
+
+def render_persona(manifest: Dict[str, Any]) -> str:
+    """Persona section appended to the base system prompt."""
+
+    def listed(key):
+        value = manifest.get(key) or []
+        return ", ".join(str(v) for v in value) if isinstance(value, list) else str(value)
+
+    lines = [f"Active persona: {manifest.get('name')} — {manifest.get('role', '')}".rstrip(" —")]
+    if manifest.get("purpose"):
+        lines.append(f"Purpose: {manifest['purpose']}")
+    for key, label in (("tone", "Tone"), ("preserve", "Preserve"), ("avoid", "Avoid")):
+        if manifest.get(key):
+            lines.append(f"{label}: {listed(key)}")
+    if manifest.get("relationship_to_kernel"):
+        lines.append(f"Kernel boundary: {manifest['relationship_to_kernel']}")
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class CompiledPersona:
+    key: str
+    name: str
+    role: str
+    merge_priority: int
+    system_prompt: str
+    llama3_system: str
+    token_count: int
+    tokens: Optional[Tuple[int, ...]] = field(default=None, repr=False)
+    manifest: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "role": self.role,
+            "merge_priority": self.merge_priority,
+            "token_count": self.token_count,
+        }
+
+
+class PersonaRegistry:
+    """Compiled personas keyed by lower-cased file stem and name."""
+
+    def __init__(
+        self,
+        directory=PERSONA_DIR,
+        base_prompt: str = "",
+        default: str = "primary",
+        check_interval: float = 2.0,
+        tokenizer: Optional[Callable[[str], Sequence[int]]] = None,
+    ):
+        self.directory = Path(directory)
+        self.base_prompt = base_prompt
+        self.default = default.lower()
+        self.check_interval = check_interval
+        self.tokenizer = tokenizer
+        self.reloads = 0
+        self.errors: Dict[str, str] = {}  # file name -> parse error
+
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._compiled: Dict[str, CompiledPersona] = {}  # file name -> persona
+        self._lookup: Dict[str, CompiledPersona] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def compile(self, key: str, manifest: Dict[str, Any]) -> CompiledPersona:
+        section = render_persona(manifest)
+        prompt = f"{self.base_prompt}\n\n{section}" if self.base_prompt else section
+        return CompiledPersona(
+            key=key,
+            name=str(manifest.get("name") or key),
+            role=str(manifest.get("role") or ""),
+            merge_priority=int(manifest.get("merge_priority") or 0),
+            system_prompt=prompt,
+            llama3_system=llama3_system_block(prompt),
+            token_count=len(self.tokenizer(prompt)) if self.tokenizer else estimate_tokens(prompt),
+            tokens=tuple(self.tokenizer(prompt)) if self.tokenizer else None,
+            manifest=manifest,
+        )
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-compile added or changed manifests; returns True when anything changed."""
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            stamps = {}
+            try:
+                entries = list(os.scandir(self.directory))
+            except OSError:
+                entries = []
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith((".yaml", ".yml")):
+                    stat = entry.stat()
+                    stamps[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            if stamps == self._stamps:
+                return False
+
+            compiled = {name: p for name, p in self._compiled.items() if name in stamps}
+            for name, stamp in stamps.items():
+                if self._stamps.get(name) == stamp and name in compiled:
+                    continue
+                try:
+                    with open(self.directory / name, "r", encoding="utf-8") as f:
+                        manifest = yaml.safe_load(f)
+                    if not isinstance(manifest, dict):
+                        raise ValueError("persona manifest must be a mapping")
+                except (OSError, ValueError, yaml.YAMLError) as e:
+                    # Keep serving the last good version of a half-written file
+                    self.errors[name] = str(e)
+                    logging.warning("Persona manifest %s could not be loaded: %s", name, e)
+                    continue
+                self.errors.pop(name, None)
+                compiled[name] = self.compile(Path(name).stem.lower(), manifest)
+
+            lookup = {}
+            for persona in sorted(compiled.values(), key=lambda p: p.merge_priority):
+                lookup[persona.name.lower()] = persona
+                lookup[persona.key] = persona
+            self._compiled, self._lookup, self._stamps = compiled, lookup, stamps
+            self.reloads += 1
+            return True
+
+    def get(self, name: Optional[str] = None) -> CompiledPersona:
+        """Compiled persona by name or file stem; the default persona when ``name`` is empty."""
+        self.refresh()
+        lookup = self._lookup
+        if name:
+            return lookup[name.lower()]
+        persona = lookup.get(self.default)
+        if persona is None:
+            if not lookup:
+                raise KeyError("no personas loaded")
+            persona = max(lookup.values(), key=lambda p: p.merge_priority)
+        return persona
+
+    def __contains__(self, name: str) -> bool:
+        self.refresh()
+        return bool(name) and name.lower() in self._lookup
+
+    def personas(self) -> List[Dict[str, Any]]:
+        self.refresh()
+        unique = {p.key: p for p in self._lookup.values()}
+        return [p.summary() for p in sorted(unique.values(), key=lambda p: -p.merge_priority)]
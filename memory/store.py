@@ -0,0 +1,363 @@
+"""Incrementally indexed store over the ``continuity/`` tree.
+
+Markdown files are split into one memory per heading section; fenced
+``yaml`` blocks and ``.yaml`` files under ``memory/`` that look like residue
+packets are validated against ``schemas/residue-schema.yaml`` and indexed as
+a single memory each.  Files are re-read only when their mtime or size
+changes and re-indexed only when their content hash changes, so ``search``
+stays cheap as the corpus grows.
+"""
+
+import datetime
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+CONTINUITY_DIR = Path(__file__).resolve().parents[1] / "continuity"
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+YAML_BLOCK_PATTERN = re.compile(r"^```ya?ml\s*\n(.*?)^```\s*$", re.MULTILINE | re.DOTALL)
+
+# Directories that hold configuration rather than memories
+SKIP_DIRS = {"schemas", "personas"}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def load_schema(path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def validate_residue(packet: Any, schema: Dict[str, Any]) -> List[str]:
+    """Return a list of problems with ``packet``; empty when it matches the schema."""
+    if not isinstance(packet, dict):
+        return ["residue packet must be a mapping"]
+    errors = [f"missing required field '{name}'" for name in schema.get("required", []) if name not in packet]
+    for name, spec in (schema.get("properties") or {}).items():
+        if name not in packet:
+            continue
+        value = packet[name]
+        kind = spec.get("type")
+        if kind == "string":
+            if spec.get("format") == "date":
+                if isinstance(value, datetime.date):
+                    continue
+                try:
+                    datetime.date.fromisoformat(str(value))
+                except ValueError:
+                    errors.append(f"'{name}' must be a YYYY-MM-DD date")
+            elif not isinstance(value, str):
+                errors.append(f"'{name}' must be a string")
+        elif kind == "array":
+            if not isinstance(value, list):
+                errors.append(f"'{name}' must be a list")
+            elif (spec.get("items") or {}).get("type") == "string" and not all(
+                isinstance(item, str) for item in value
+            ):
+                errors.append(f"'{name}' items must be strings")
+    return errors
+
+
+def render_residue(packet: Dict[str, Any]) -> str:
+    lines = [f"Session {packet.get('session_date')}: {packet.get('session_context', '')}"]
+    for name, value in packet.items():
+        if isinstance(value, list) and value:
+            lines.append(f"{name.replace('_', ' ')}: " + "; ".join(str(v) for v in value))
+    return "\n".join(lines)
+
+
+@dataclass
+class Memory:
+    id: str
+    path: str
+    kind: str
+    title: str
+    text: str
+    tokens: int
+    terms: Counter = field(repr=False, default_factory=Counter)
+    length: int = 0
+
+    def to_dict(self, score: Optional[float] = None) -> Dict[str, Any]:
+        data = {"id": self.id, "path": self.path, "kind": self.kind, "title": self.title, "text": self.text}
+        if score is not None:
+            data["score"] = round(score, 4)
+        return data
+
+
+@dataclass
+class _FileEntry:
+    stamp: Tuple[int, int]
+    digest: str
+    memory_ids: List[str]
+
+
+class ContinuityStore:
+    """BM25 index over continuity memories, refreshed incrementally on access."""
+
+    def __init__(
+        self,
+        root=CONTINUITY_DIR,
+        schema_path=None,
+        check_interval: float = 2.0,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.root = Path(root)
+        self.schema_path = Path(schema_path) if schema_path else self.root / "schemas" / "residue-schema.yaml"
+        self.check_interval = check_interval
+        self.k1 = k1
+        self.b = b
+
+        self.memories: Dict[str, Memory] = {}
+        self.residues: Dict[str, Dict[str, Any]] = {}  # memory id -> validated packet
+        self.invalid: Dict[str, List[str]] = {}  # path -> validation errors
+        self.stats_counters = {"refreshes": 0, "files_indexed": 0, "files_skipped": 0}
+        self._files: Dict[str, _FileEntry] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {memory id: tf}
+        self._total_length = 0
+        self._schema: Optional[Dict[str, Any]] = None
+        self._schema_stamp: Optional[Tuple[int, int]] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # -- indexing -------------------------------------------------------
+    def _candidate_files(self) -> List[Path]:
+        found = []
+        if not self.root.is_dir():
+            return found
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            rel = Path(dirpath).relative_to(self.root)
+            if not rel.parts:
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            in_memory_dir = bool(rel.parts) and rel.parts[0] == "memory"
+            for name in filenames:
+                if name.endswith(".md") or (in_memory_dir and name.endswith((".yaml", ".yml"))):
+                    found.append(Path(dirpath) / name)
+        return found
+
+    def _load_schema(self):
+        try:
+            stat = os.stat(self.schema_path)
+        except OSError:
+            self._schema, self._schema_stamp = {}, None
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._schema_stamp:
+            return False
+        self._schema, self._schema_stamp = load_schema(self.schema_path), stamp
+        return True
+
+    def _kind(self, rel: str) -> str:
+        parts = rel.split("/")
+        if parts[0] == "memory" and len(parts) > 1:
+            return parts[1]
+        return parts[0] if len(parts) > 1 else "document"
+
+    def _parse(self, rel: str, text: str) -> List[Memory]:
+        memories: List[Memory] = []
+        errors: List[str] = []
+
+        def add(kind, title, body, packet=None):
+            body = body.strip()
+            if not body:
+                return
+            terms = Counter(tokenize(f"{title}\n{body}"))
+            memory = Memory(
+                id=f"{rel}#{len(memories)}",
+                path=rel,
+                kind=kind,
+                title=title,
+                text=body,
+                tokens=estimate_tokens(body),
+                terms=terms,
+                length=sum(terms.values()),
+            )
+            memories.append(memory)
+            if packet is not None:
+                self.residues[memory.id] = packet
+
+        def add_packet(raw, title):
+            try:
+                packet = yaml.safe_load(raw)
+            except yaml.YAMLError as e:
+                errors.append(f"invalid YAML: {e}")
+                return False
+            if not isinstance(packet, dict) or "session_date" not in packet:
+                return False
+            problems = validate_residue(packet, self._schema or {})
+            if problems:
+                errors.extend(problems)
+                return False
+            add("residue", title, render_residue(packet), packet)
+            return True
+
+        kind = self._kind(rel)
+        # Residue packets only live under memory/; YAML elsewhere (e.g. templates) is plain text
+        in_memory_dir = rel.startswith("memory/")
+        if rel.endswith((".yaml", ".yml")):
+            if not add_packet(text, Path(rel).stem):
+                add(kind, Path(rel).stem, text)
+        else:
+            doc_title = Path(rel).stem
+            for match in YAML_BLOCK_PATTERN.finditer(text) if in_memory_dir else ():
+                if add_packet(match.group(1), doc_title):
+                    text = text.replace(match.group(0), "")
+
+            title, lines = doc_title, []
+            for line in text.splitlines():
+                heading = HEADING_PATTERN.match(line)
+                if heading:
+                    add(kind, title, "\n".join(lines))
+                    title, lines = heading.group(2), []
+                    if len(heading.group(1)) == 1:
+                        doc_title = title
+                    else:
+                        title = f"{doc_title} / {title}"
+                else:
+                    lines.append(line)
+            add(kind, title, "\n".join(lines))
+
+        if errors:
+            self.invalid[rel] = errors
+            logging.warning("Residue packet in %s failed validation: %s", rel, "; ".join(errors))
+        else:
+            self.invalid.pop(rel, None)
+        return memories
+
+    def _remove(self, rel: str):
+        entry = self._files.pop(rel, None)
+        if entry is None:
+            return
+        for memory_id in entry.memory_ids:
+            memory = self.memories.pop(memory_id)
+            self.residues.pop(memory_id, None)
+            self._total_length -= memory.length
+            for term in memory.terms:
+                postings = self._postings[term]
+                del postings[memory_id]
+                if not postings:
+                    del self._postings[term]
+        self.invalid.pop(rel, None)
+
+    def _add(self, rel: str, stamp: Tuple[int, int], digest: str, text: str):
+        memories = self._parse(rel, text)
+        for memory in memories:
+            self.memories[memory.id] = memory
+            self._total_length += memory.length
+            for term, tf in memory.terms.items():
+                self._postings.setdefault(term, {})[memory.id] = tf
+        self._files[rel] = _FileEntry(stamp, digest, [m.id for m in memories])
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-index new, changed and deleted files; returns True when anything changed."""
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            self.stats_counters["refreshes"] += 1
+            # A schema change can flip validation results, so every file is re-parsed
+            rebuild = self._load_schema() and bool(self._files)
+            changed = False
+            seen = set()
+            for path in self._candidate_files():
+                rel = path.relative_to(self.root).as_posix()
+                seen.add(rel)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                entry = self._files.get(rel)
+                if entry is not None and entry.stamp == stamp and not rebuild:
+                    self.stats_counters["files_skipped"] += 1
+                    continue
+                try:
+                    data = path.read_bytes()
+                except OSError:
+                    continue
+                digest = hashlib.sha256(data).hexdigest()
+                if entry is not None and entry.digest == digest and not rebuild:
+                    entry.stamp = stamp  # touched but unchanged
+                    self.stats_counters["files_skipped"] += 1
+                    continue
+                self._remove(rel)
+                self._add(rel, stamp, digest, data.decode("utf-8", errors="replace"))
+                self.stats_counters["files_indexed"] += 1
+                changed = True
+
+            for rel in set(self._files) - seen:
+                self._remove(rel)
+                changed = True
+            return changed
+
+    # -- retrieval ------------------------------------------------------
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-``k`` memories for ``query`` by BM25, best first."""
+        self.refresh()
+        with self._lock:
+            n = len(self.memories)
+            if not n:
+                return []
+            avgdl = self._total_length / n or 1.0
+            scores: Dict[str, float] = {}
+            for term, qtf in Counter(tokenize(query)).items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for memory_id, tf in postings.items():
+                    norm = 1 - self.b + self.b * self.memories[memory_id].length / avgdl
+                    scores[memory_id] = scores.get(memory_id, 0.0) + qtf * idf * tf * (self.k1 + 1) / (
+                        tf + self.k1 * norm
+                    )
+            best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            return [self.memories[memory_id].to_dict(score) for memory_id, score in best]
+
+    def context(self, query: str, k: int = 4, token_budget: int = 512) -> List[Dict[str, Any]]:
+        """The best of the top-``k`` memories whose combined text fits ``token_budget``."""
+        selected, used = [], 0
+        for memory in self.search(query, k):
+            cost = estimate_tokens(memory["text"])
+            if used + cost > token_budget:
+                continue
+            selected.append(memory)
+            used += cost
+        return selected
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self._files),
+            "memories": len(self.memories),
+            "terms": len(self._postings),
+            "residue_packets": len(self.residues),
+            "invalid_files": sorted(self.invalid),
+            **self.stats_counters,
+        }
+
+
+def format_memories(memories: List[Dict[str, Any]]) -> str:
+    """Render retrieved memories as a system prompt section."""
+    if not memories:
+        return ""
+    blocks = [f"[{m['path']} — {m['title']}]\n{m['text']}" for m in memories]
+    return "Relevant continuity memories:\n\n" + "\n\n".join(blocks)
@@ -0,0 +1,311 @@
+import json
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Same tokenization as sklearn's TfidfVectorizer defaults
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Vectorized splitmix64 finalizer; deterministic pseudo-random bits per input."""
+    with np.errstate(over='ignore'):
+        x = (x + np.uint64(0x9E3779B97F4A7C15)) & _MASK64
+        x = ((x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)) & _MASK64
+        x = ((x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)) & _MASK64
+        return x ^ (x >> np.uint64(31))
+
+
+class SnippetIndex:
+    """Inverted TF-IDF index over prompts with top-k cosine retrieval of code snippets.
+
+    Documents land in a small in-memory delta segment and are merged into the
+    compressed-column main segment once the delta grows past a tenth of it, so
+    new prompt/code pairs never require a full retrain.  IDF weights are
+    refreshed at each merge.  With ``approximate=True`` candidates come from
+    SimHash (random-projection) buckets and only those are scored exactly.
+    """
+
+    def __init__(self, approximate: bool = False, n_bits: int = 128, n_bands: int = 8, seed: int = 0):
+        if n_bits % n_bands or n_bits // n_bands > 64 or n_bits % 8:
+            raise ValueError('n_bits must split into n_bands of at most 64 bits each')
+        self.approximate = approximate
+        self.n_bits = n_bits
+        self.n_bands = n_bands
+        self.seed = seed
+
+        self.vocab: Dict[str, int] = {}
+        self.codes: List[str] = []
+
+        # Main segment: term counts as CSR (rows) and CSC (postings)
+        self._csr = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._csc = self._csr.tocsc()
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._default_idf = 1.0
+
+        # Delta segment: rows and postings of documents added since the last merge
+        self._delta_rows: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._delta_postings: Dict[int, List[Tuple[int, float]]] = {}
+        self._delta_norms: List[float] = []
+
+        # SimHash signatures (n_docs x n_bits/8) and per-band bucket tables
+        self._signatures = np.zeros((0, n_bits // 8), dtype=np.uint8)
+        self._delta_signatures: List[np.ndarray] = []
+        self._band_keys: List[np.ndarray] = []
+        self._band_order: List[np.ndarray] = []
+        self._delta_buckets: List[Dict[int, List[int]]] = [{} for _ in range(n_bands)]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def _n_main(self) -> int:
+        return self._csr.shape[0]
+
+    def _idf_of(self, term_ids: np.ndarray) -> np.ndarray:
+        known = term_ids < len(self._idf)
+        idf = np.full(len(term_ids), self._default_idf, dtype=np.float32)
+        idf[known] = self._idf[term_ids[known]]
+        return idf
+
+    def _vectorize(self, text: str, grow: bool) -> Tuple[np.ndarray, np.ndarray]:
+        counts = Counter()
+        for token in tokenize(text):
+            term = self.vocab.get(token)
+            if term is None:
+                if not grow:
+                    continue
+                term = self.vocab[token] = len(self.vocab)
+            counts[term] += 1
+        terms = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return terms, tf
+
+    def _signature(self, terms: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Sign bits of a random ±1 projection derived by hashing (term, bit).
+
+        Signatures are computed from raw term counts so they stay valid when
+        IDF weights change at a merge; candidates are re-scored with TF-IDF.
+        """
+        bits = np.arange(self.n_bits, dtype=np.uint64)
+        keys = (terms.astype(np.uint64)[:, None] * np.uint64(self.n_bits) + bits) ^ np.uint64(self.seed)
+        signs = (_splitmix64(keys) & np.uint64(1)).astype(np.float32) * 2 - 1
+        projection = weights @ signs if len(terms) else np.zeros(self.n_bits, dtype=np.float32)
+        return np.packbits(projection > 0)
+
+    def _band_values(self, signatures: np.ndarray) -> np.ndarray:
+        """One uint64 bucket key per (document, band)."""
+        per_band = signatures.shape[1] // self.n_bands
+        padded = np.zeros((signatures.shape[0], self.n_bands, 8), dtype=np.uint8)
+        padded[:, :, :per_band] = signatures.reshape(-1, self.n_bands, per_band)
+        return padded.view('<u8').reshape(-1, self.n_bands)
+
+    def add(self, prompts: List[str], codes: List[str]) -> List[int]:
+        """Index new prompt/code pairs; returns their document ids."""
+        if len(prompts) != len(codes):
+            raise ValueError('prompts and codes must have the same length')
+        ids = []
+        for prompt, code in zip(prompts, codes):
+            doc = len(self.codes)
+            terms, tf = self._vectorize(prompt, grow=True)
+            weights = tf * self._idf_of(terms)
+            self.codes.append(code)
+            self._delta_rows.append((terms, tf))
+            self._delta_norms.append(float(np.sqrt(weights @ weights)) or 1.0)
+            for term, count in zip(terms.tolist(), tf.tolist()):
+                self._delta_postings.setdefault(term, []).append((doc, count))
+            if self.approximate:
+                signature = self._signature(terms, tf)
+                self._delta_signatures.append(signature)
+                for band, key in enumerate(self._band_values(signature[None, :])[0].tolist()):
+                    self._delta_buckets[band].setdefault(key, []).append(doc)
+            ids.append(doc)
+
+        if len(self._delta_rows) > max(1024, self._n_main // 10):
+            self.merge()
+        return ids
+
+    def merge(self):
+        """Fold the delta segment into the main segment and refresh IDF weights."""
+        if not self._delta_rows and self._csr.shape[1] == len(self.vocab):
+            return
+        n_vocab = len(self.vocab)
+        indptr = [0]
+        indices, data = [], []
+        for terms, tf in self._delta_rows:
+            indices.append(terms)
+            data.append(tf)
+            indptr.append(indptr[-1] + len(terms))
+        delta = sparse.csr_matrix(
+            (
+                np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+                np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+                np.asarray(indptr),
+            ),
+            shape=(len(self._delta_rows), n_vocab),
+            dtype=np.float32,
+        )
+        main = self._csr
+        main.resize((main.shape[0], n_vocab))
+        if self.approximate and self._delta_signatures:
+            self._signatures = np.vstack([self._signatures] + self._delta_signatures)
+        self._refresh(sparse.vstack([main, delta], format='csr', dtype=np.float32))
+
+        self._delta_rows = []
+        self._delta_postings = {}
+        self._delta_norms = []
+        self._delta_signatures = []
+        self._delta_buckets = [{} for _ in range(self.n_bands)]
+
+    def _build_band_tables(self):
+        values = self._band_values(self._signatures)
+        self._band_order = [np.argsort(values[:, b], kind='stable') for b in range(self.n_bands)]
+        self._band_keys = [values[order, b] for b, order in enumerate(self._band_order)]
+
+    def _norm(self, docs: np.ndarray) -> np.ndarray:
+        norms = np.empty(len(docs), dtype=np.float32)
+        in_main = docs < self._n_main
+        norms[in_main] = self._norms[docs[in_main]]
+        if not in_main.all():
+            delta = np.asarray(self._delta_norms, dtype=np.float32)
+            norms[~in_main] = delta[docs[~in_main] - self._n_main]
+        return norms
+
+    def _candidates(self, terms: np.ndarray, tf: np.ndarray) -> np.ndarray:
+        signature = self._signature(terms, tf)
+        keys = self._band_values(signature[None, :])[0]
+        found = []
+        for band, key in enumerate(keys):
+            if self._band_keys:
+                band_keys = self._band_keys[band]
+                lo = np.searchsorted(band_keys, key, side='left')
+                hi = np.searchsorted(band_keys, key, side='right')
+                found.append(self._band_order[band][lo:hi])
+            found.append(np.asarray(self._delta_buckets[band].get(int(key), []), dtype=np.int64))
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def _score_exact(self, terms, weights) -> Tuple[np.ndarray, np.ndarray]:
+        docs, values = [], []
+        indptr, n_main_terms = self._csc.indptr, self._csc.shape[1]
+        for term, weight in zip(terms.tolist(), weights.tolist()):
+            if term < n_main_terms:
+                lo, hi = indptr[term], indptr[term + 1]
+                docs.append(self._csc.indices[lo:hi])
+                values.append(self._csc.data[lo:hi] * (self._idf[term] * weight))
+            postings = self._delta_postings.get(term)
+            if postings:
+                delta_docs, delta_tf = zip(*postings)
+                idf = self._idf[term] if term < len(self._idf) else self._default_idf
+                docs.append(np.asarray(delta_docs, dtype=np.int64))
+                values.append(np.asarray(delta_tf, dtype=np.float32) * (idf * weight))
+        if not docs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        docs = np.concatenate(docs).astype(np.int64)
+        unique, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(values)) / self._norm(unique)
+        return unique, scores
+
+    def _score_candidates(self, candidates, terms, weights) -> Tuple[np.ndarray, np.ndarray]:
+        query = dict(zip(terms.tolist(), weights.tolist()))
+        scores = np.zeros(len(candidates), dtype=np.float64)
+        for i, doc in enumerate(candidates.tolist()):
+            if doc < self._n_main:
+                lo, hi = self._csr.indptr[doc], self._csr.indptr[doc + 1]
+                row_terms, row_tf = self._csr.indices[lo:hi].tolist(), self._csr.data[lo:hi].tolist()
+            else:
+                row_terms, row_tf = (a.tolist() for a in self._delta_rows[doc - self._n_main])
+            idf = self._idf_of(np.asarray(row_terms, dtype=np.int64))
+            scores[i] = sum(query.get(t, 0.0) * tf * w for t, tf, w in zip(row_terms, row_tf, idf.tolist()))
+        return candidates, scores / self._norm(candidates)
+
+    def search(self, prompt: str, k: int = 5) -> List[Tuple[str, float, int]]:
+        """Return up to ``k`` ``(code, cosine score, doc id)`` tuples, best first."""
+        terms, tf = self._vectorize(prompt, grow=False)
+        if not len(terms):
+            return []
+        weights = tf * self._idf_of(terms)
+        weights /= np.sqrt(weights @ weights)
+
+        docs = None
+        if self.approximate:
+            candidates = self._candidates(terms, tf)
+            if len(candidates) >= k:
+                docs, scores = self._score_candidates(candidates, terms, weights)
+        if docs is None:
+            docs, scores = self._score_exact(terms, weights)
+
+        if len(docs) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            docs, scores = docs[top], scores[top]
+        order = np.lexsort((docs, -scores))
+        return [(self.codes[d], float(scores[i]), int(d)) for i, d in ((i, docs[i]) for i in order)]
+
+    def search_batch(self, prompts: List[str], k: int = 5) -> List[List[Tuple[str, float, int]]]:
+        return [self.search(prompt, k) for prompt in prompts]
+
+    def save(self, path: str) -> str:
+        """Persist as a compressed ``.npz`` of flat arrays (no pickles)."""
+        self.merge()
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        codes = [c.encode('utf-8') for c in self.codes]
+        np.savez_compressed(
+            path,
+            data=self._csr.data.astype(np.uint16 if self._csr.data.max(initial=0) < 65536 else np.float32),
+            indices=self._csr.indices.astype(np.int32),
+            indptr=self._csr.indptr.astype(np.int64),
+            vocab=np.frombuffer('\n'.join(vocab).encode('utf-8'), dtype=np.uint8),
+            codes=np.frombuffer(b''.join(codes), dtype=np.uint8),
+            code_offsets=np.cumsum([0] + [len(c) for c in codes]).astype(np.int64),
+            signatures=self._signatures,
+            params=np.frombuffer(
+                json.dumps(
+                    {'approximate': self.approximate, 'n_bits': self.n_bits, 'n_bands': self.n_bands, 'seed': self.seed}
+                ).encode(),
+                dtype=np.uint8,
+            ),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'SnippetIndex':
+        with np.load(path) as f:
+            index = cls(**json.loads(f['params'].tobytes().decode()))
+            vocab_blob = f['vocab'].tobytes().decode('utf-8')
+            index.vocab = {t: i for i, t in enumerate(vocab_blob.split('\n'))} if vocab_blob else {}
+            blob, offsets = f['codes'].tobytes(), f['code_offsets']
+            index.codes = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+            csr = sparse.csr_matrix(
+                (f['data'].astype(np.float32), f['indices'], f['indptr']),
+                shape=(len(index.codes), len(index.vocab)),
+            )
+            index._signatures = f['signatures']
+        # Postings, norms, IDF and band tables are derived from the stored counts
+        index._refresh(csr)
+        return index
+
+    def _refresh(self, csr: sparse.csr_matrix):
+        """Install ``csr`` as the main segment and recompute everything derived from it."""
+        csr.sort_indices()
+        self._csr = csr
+        self._csc = csr.tocsc()
+        n_docs, n_vocab = csr.shape
+        df = np.bincount(csr.indices, minlength=n_vocab)
+        # Smooth IDF, as TfidfVectorizer(smooth_idf=True)
+        self._idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        self._default_idf = float(math.log(1 + n_docs) + 1)
+        squared = csr.multiply(csr) @ (self._idf ** 2)
+        self._norms = np.sqrt(np.asarray(squared, dtype=np.float32)).ravel()
+        self._norms[self._norms == 0] = 1.0
+        if self.approximate:
+            self._build_band_tables()
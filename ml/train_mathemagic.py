@@ -1,9 +1,15 @@
+import argparse
 import json
 import os
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.neighbors import KNeighborsClassifier
 
+try:
+    from ml.retrieval import SnippetIndex
+except ImportError:  # run as a script: python ml/train_mathemagic.py
+    from retrieval import SnippetIndex
+
 
 def load_data(path: str):
     """Load training examples from JSON file."""
@@ -32,8 +38,32 @@ def save_model(vectorizer, clf, codes, out_dir="models"):
     return model_path
 
 
+def train_index(prompts, codes, approximate=False):
+    """Build an inverted TF-IDF retrieval index over the prompts."""
+    index = SnippetIndex(approximate=approximate)
+    index.add(prompts, codes)
+    index.merge()
+    return index
+
+
+def save_index(index, out_dir="models"):
+    os.makedirs(out_dir, exist_ok=True)
+    return index.save(os.path.join(out_dir, "mathemagic_index.npz"))
+
+
 if __name__ == "__main__":
-    prompts, codes = load_data(os.path.join("ml", "training_data.json"))
-    vect, clf, codes = train_model(prompts, codes)
-    path = save_model(vect, clf, codes)
-    print(f"Model saved to {path}")
+    parser = argparse.ArgumentParser(description="Build the mathemagic snippet index")
+    parser.add_argument("data", nargs="?", default=os.path.join("ml", "training_data.json"))
+    parser.add_argument("--add", action="store_true", help="append to the existing index instead of rebuilding")
+    parser.add_argument("--approximate", action="store_true", help="enable random-projection candidate search")
+    args = parser.parse_args()
+
+    prompts, codes = load_data(args.data)
+    existing = os.path.join("models", "mathemagic_index.npz")
+    if args.add and os.path.exists(existing):
+        index = SnippetIndex.load(existing)
+        index.add(prompts, codes)
+    else:
+        index = train_index(prompts, codes, approximate=args.approximate)
+    path = save_index(index)
+    print(f"Index with {len(index)} snippets saved to {path}")
@@ -1,19 +1,143 @@
+import os
 import sys
+import threading
+import time
+from typing import List, Optional
+
 import joblib
 from sklearn.metrics.pairwise import cosine_similarity
 
+try:
+    from ml.retrieval import SnippetIndex
+except ImportError:  # run as a script: python ml/use_model.py
+    from retrieval import SnippetIndex
+
 MODEL_PATH = 'models/mathemagic_model.pkl'
+INDEX_PATH = 'models/mathemagic_index.npz'
+
+def _is_index(path) -> bool:
+    return str(path).endswith('.npz')
+
+
+def default_model_path():
+    """Prefer the retrieval index; fall back to the legacy KNN pickle."""
+    return INDEX_PATH if os.path.exists(INDEX_PATH) or not os.path.exists(MODEL_PATH) else MODEL_PATH
+
+
+def load_model(path=MODEL_PATH, mmap_mode=None):
+    """Load the index or a legacy pickle; ``mmap_mode`` only applies to pickles."""
+    if _is_index(path):
+        return SnippetIndex.load(path)
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+class ModelService:
+    """Keeps the mathemagic model resident and reloads it when the file changes."""
+
+    def __init__(self, path=MODEL_PATH, mmap_mode: Optional[str] = None, check_interval: float = 1.0):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self.loaded_at = None
+        self.reloads = 0
+        self._model = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if self._model is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._model is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                stamp = self._file_stamp()
+            except OSError:
+                if self._model is None:
+                    raise
+                return  # file briefly missing while being rewritten; keep serving
+            if stamp == self._stamp:
+                return
+            try:
+                model = load_model(self.path, self.mmap_mode)
+            except Exception:
+                if self._model is None:
+                    raise
+                return  # partially written file; retry on the next check
+            self._model, self._stamp = model, stamp
+            self.loaded_at = time.time()
+            self.reloads += 1
+
+    @property
+    def model(self):
+        self._reload_if_changed()
+        return self._model
+
+    def search_batch(self, prompts: List[str], k: int = 5) -> List[List[dict]]:
+        """Return the top ``k`` snippets with cosine scores for each prompt."""
+        if not prompts:
+            return []
+        model = self.model
+        if isinstance(model, SnippetIndex):
+            return [
+                [{'code': code, 'score': score} for code, score, _ in matches]
+                for matches in model.search_batch(prompts, k)
+            ]
+        vect = model['vectorizer'].transform(prompts)
+        k = min(k, len(model['codes']))
+        # TF-IDF rows are L2-normalised, so euclidean distance maps to cosine
+        distances, neighbors = model['classifier'].kneighbors(vect, n_neighbors=k)
+        return [
+            [{'code': model['codes'][n], 'score': float(1 - d * d / 2)} for d, n in zip(row_d, row_n)]
+            for row_d, row_n in zip(distances, neighbors)
+        ]
+
+    def query_batch(self, prompts: List[str]) -> List[str]:
+        """Return the best snippet for each prompt using one vectorize/predict call."""
+        if not prompts:
+            return []
+        model = self.model
+        if isinstance(model, SnippetIndex):
+            return [matches[0]['code'] if matches else None for matches in self.search_batch(prompts, 1)]
+        vect = model['vectorizer'].transform(prompts)
+        preds = model['classifier'].predict(vect)
+        return [model['codes'][pred] for pred in preds]
+
+    def query(self, prompt: str) -> str:
+        return self.query_batch([prompt])[0]
+
+    def info(self) -> dict:
+        return {
+            'path': str(self.path),
+            'loaded': self._model is not None,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            # The compressed index is always read into memory
+            'mmap_mode': None if _is_index(self.path) else self.mmap_mode,
+        }
+
+
+_service = None
+
 
-def load_model(path=MODEL_PATH):
-    return joblib.load(path)
+def get_service(path=None, mmap_mode=None) -> ModelService:
+    """Return the process-wide service for ``path``, creating it on first use."""
+    global _service
+    path = path or default_model_path()
+    if _service is None or _service.path != path:
+        _service = ModelService(path, mmap_mode=mmap_mode)
+    return _service
 
 
 def query(prompt: str):
-    model = load_model()
-    vect = model['vectorizer'].transform([prompt])
-    pred = model['classifier'].predict(vect)[0]
-    code = model['codes'][pred]
-    return code
+    return get_service().query(prompt)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,288 @@
+"""Shared training engine for the text classifiers.
+
+Token counts are computed once per dataset and cached on disk as an
+uncompressed sparse ``.npz`` keyed by the dataset's content hash and the
+vectorizer parameters.  Cached matrices are memory-mapped, so every
+cross-validation fold and grid point — including those running in worker
+processes — reuses them without re-tokenizing the corpus.  TF-IDF weighting
+is refit per fold on top of the cached counts.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import struct
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+from sklearn.model_selection import KFold, StratifiedKFold, train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+try:
+    from nlp.streaming import format_report, stream_train
+except ImportError:  # imported from a script inside nlp/
+    from streaming import format_report, stream_train
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / ".cache" / "features"
+
+ESTIMATORS = {
+    "nb": MultinomialNB,
+    "logreg": lambda: LogisticRegression(max_iter=1000),
+}
+
+# Grids searched by the training scripts' --search flag
+DEFAULT_GRIDS = {
+    "nb": {"tfidf__sublinear_tf": [False, True], "clf__alpha": [0.01, 0.1, 1.0]},
+    "logreg": {"tfidf__sublinear_tf": [False, True], "clf__C": [0.1, 1.0, 10.0]},
+}
+
+
+def dataset_hash(path) -> str:
+    """SHA-256 of the file contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path, vectorizer_params: Dict[str, Any], text_col: str, label_col: str) -> str:
+    spec = json.dumps(
+        {
+            "dataset": dataset_hash(path),
+            "vectorizer": vectorizer_params,
+            "columns": [text_col, label_col],
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(spec.encode()).hexdigest()[:32]
+
+
+def _load_npz_mmap(path) -> Dict[str, np.ndarray]:
+    """Memory-map every array of an uncompressed ``.npz`` in place."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as fh:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            fh.seek(info.header_offset)
+            name_len, extra_len = struct.unpack("<HH", fh.read(30)[26:30])
+            fh.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(fh)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(fh)
+            if dtype.hasobject or 0 in shape:
+                arrays[name] = np.load(archive.open(info), allow_pickle=False)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                shape=shape,
+                offset=fh.tell(),
+                order="F" if fortran else "C",
+            )
+    return arrays
+
+
+def _arrays_to_features(arrays) -> Tuple[sparse.csr_matrix, np.ndarray, Dict[str, int]]:
+    X = sparse.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]),
+        shape=tuple(int(n) for n in arrays["shape"]),
+        copy=False,
+    )
+    blob = bytes(arrays["vocabulary"]).decode("utf-8")
+    vocabulary = {term: i for i, term in enumerate(blob.split("\n"))} if blob else {}
+    return X, np.asarray(arrays["labels"]), vocabulary
+
+
+def load_features(
+    path,
+    vectorizer_params: Optional[Dict[str, Any]] = None,
+    text_col: str = "text",
+    label_col: str = "label",
+    cache_dir=CACHE_DIR,
+) -> Tuple[sparse.csr_matrix, np.ndarray, Dict[str, int], Path]:
+    """Return ``(counts, labels, vocabulary, cache_path)``, tokenizing only on a cache miss."""
+    vectorizer_params = dict(vectorizer_params or {})
+    cache_dir = Path(cache_dir)
+    cache_path = cache_dir / f"{cache_key(path, vectorizer_params, text_col, label_col)}.npz"
+
+    if not cache_path.exists():
+        df = pd.read_csv(path, usecols=[text_col, label_col]).dropna()
+        vectorizer = CountVectorizer(**vectorizer_params)
+        X = vectorizer.fit_transform(df[text_col].astype(str)).tocsr()
+        X.sort_indices()
+        vocab = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+
+        # Index arrays are stored in the dtype scipy would pick, so loading never copies them
+        index_dtype = np.int32 if X.nnz < 2 ** 31 and max(X.shape) < 2 ** 31 else np.int64
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            data=X.data.astype(np.float32),
+            indices=X.indices.astype(index_dtype),
+            indptr=X.indptr.astype(index_dtype),
+            shape=np.asarray(X.shape, dtype=np.int64),
+            labels=df[label_col].astype(str).to_numpy(dtype=str),
+            vocabulary=np.frombuffer("\n".join(vocab).encode("utf-8"), dtype=np.uint8),
+        )
+        os.replace(tmp_path, cache_path)
+
+    X, y, vocabulary = _arrays_to_features(_load_npz_mmap(cache_path))
+    return X, y, vocabulary, cache_path
+
+
+def build_pipeline(estimator: str = "nb", vocabulary=None, vectorizer_params=None, **params) -> Pipeline:
+    """``counts -> tfidf -> clf`` pipeline; ``params`` use ``tfidf__``/``clf__`` prefixes."""
+    vectorizer_params = dict(vectorizer_params or {})
+    if vocabulary is not None:
+        vectorizer_params["vocabulary"] = vocabulary
+    pipeline = Pipeline([
+        ("counts", CountVectorizer(**vectorizer_params)),
+        ("tfidf", TfidfTransformer()),
+        ("clf", ESTIMATORS[estimator]()),
+    ])
+    pipeline.set_params(**params)
+    return pipeline
+
+
+def _fit_counts(pipeline: Pipeline, X, y) -> Pipeline:
+    """Fit the tfidf and clf steps on precomputed counts."""
+    weighted = pipeline.named_steps["tfidf"].fit_transform(X)
+    pipeline.named_steps["clf"].fit(weighted, y)
+    return pipeline
+
+
+def _predict_counts(pipeline: Pipeline, X) -> np.ndarray:
+    return pipeline.named_steps["clf"].predict(pipeline.named_steps["tfidf"].transform(X))
+
+
+_worker_features: Dict[str, Tuple[sparse.csr_matrix, np.ndarray]] = {}
+
+
+def _evaluate_fold(cache_path: str, estimator: str, params: Dict[str, Any], train_idx, test_idx) -> Dict[str, float]:
+    """Worker entry point: memory-map the cached counts once per process and score one fold."""
+    if cache_path not in _worker_features:
+        X, y, _ = _arrays_to_features(_load_npz_mmap(cache_path))
+        _worker_features[cache_path] = (X, y)
+    X, y = _worker_features[cache_path]
+
+    pipeline = _fit_counts(build_pipeline(estimator, **params), X[train_idx], y[train_idx])
+    predicted = _predict_counts(pipeline, X[test_idx])
+    return {
+        "accuracy": accuracy_score(y[test_idx], predicted),
+        "f1_macro": f1_score(y[test_idx], predicted, average="macro", zero_division=0),
+    }
+
+
+def _folds(y: np.ndarray, cv: int, seed: int = 42):
+    _, counts = np.unique(y, return_counts=True)
+    if counts.min() >= cv:
+        return list(StratifiedKFold(cv, shuffle=True, random_state=seed).split(np.zeros(len(y)), y))
+    return list(KFold(min(cv, len(y)), shuffle=True, random_state=seed).split(np.zeros(len(y))))
+
+
+def grid_search(
+    path,
+    estimator: str = "nb",
+    param_grid: Optional[Dict[str, List[Any]]] = None,
+    cv: int = 5,
+    n_jobs: Optional[int] = None,
+    vectorizer_params: Optional[Dict[str, Any]] = None,
+    text_col: str = "text",
+    label_col: str = "label",
+    cache_dir=CACHE_DIR,
+) -> List[Dict[str, Any]]:
+    """Cross-validate every grid point, best first; folds run across a process pool."""
+    param_grid = param_grid if param_grid is not None else DEFAULT_GRIDS[estimator]
+    _, y, _, cache_path = load_features(path, vectorizer_params, text_col, label_col, cache_dir)
+    folds = _folds(y, cv)
+    names = sorted(param_grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+    jobs = [(params, fold) for params in candidates for fold in folds]
+
+    args = [(str(cache_path), estimator, params, train, test) for params, (train, test) in jobs]
+    if n_jobs == 1:
+        scores = [_evaluate_fold(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            scores = list(pool.map(_evaluate_fold, *zip(*args)))
+
+    results = []
+    for i, params in enumerate(candidates):
+        fold_scores = scores[i * len(folds):(i + 1) * len(folds)]
+        f1 = [s["f1_macro"] for s in fold_scores]
+        results.append({
+            "params": params,
+            "mean_f1_macro": float(np.mean(f1)),
+            "std_f1_macro": float(np.std(f1)),
+            "mean_accuracy": float(np.mean([s["accuracy"] for s in fold_scores])),
+        })
+    return sorted(results, key=lambda r: r["mean_f1_macro"], reverse=True)
+
+
+def train(
+    path,
+    estimator: str = "nb",
+    params: Optional[Dict[str, Any]] = None,
+    test_size: float = 0.2,
+    vectorizer_params: Optional[Dict[str, Any]] = None,
+    text_col: str = "text",
+    label_col: str = "label",
+    cache_dir=CACHE_DIR,
+    report: bool = True,
+) -> Pipeline:
+    """Hold-out train/evaluate on cached counts; returns a pipeline that accepts raw text."""
+    X, y, vocabulary, _ = load_features(path, vectorizer_params, text_col, label_col, cache_dir)
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=test_size, random_state=42)
+    pipeline = build_pipeline(estimator, vocabulary, vectorizer_params, **(params or {}))
+    _fit_counts(pipeline, X[train_idx], y[train_idx])
+    if report:
+        print(classification_report(y[test_idx], _predict_counts(pipeline, X[test_idx]), zero_division=0))
+    return pipeline
+
+
+def search_and_train(
+    path,
+    estimator: str = "nb",
+    search: bool = False,
+    n_jobs: Optional[int] = None,
+    stream: bool = False,
+    chunksize: int = 10000,
+    cache_dir=CACHE_DIR,
+) -> Pipeline:
+    """Entry point shared by the training scripts' ``--stream``/``--search`` flags.
+
+    ``stream`` trains out of core; otherwise ``search`` first cross-validates
+    ``DEFAULT_GRIDS[estimator]``, prints the ranking and trains with the best
+    parameters.
+    """
+    if stream:
+        pipeline, matrix, classes = stream_train(path, estimator=estimator, chunksize=chunksize)
+        print(format_report(matrix, classes))
+        return pipeline
+
+    params = {}
+    if search:
+        results = grid_search(path, estimator, n_jobs=n_jobs, cache_dir=cache_dir)
+        for result in results:
+            print(f"{result['mean_f1_macro']:.3f} ± {result['std_f1_macro']:.3f}  {result['params']}")
+        params = results[0]["params"]
+    return train(path, estimator, params, cache_dir=cache_dir)
@@ -0,0 +1,155 @@
+"""Resident text classifier with batched and micro-batched inference.
+
+``ClassifierService`` loads a trained pipeline (``nlp_training/model.joblib``
+by default) once and classifies whole batches with a single
+``predict_proba`` call.  ``MicroBatcher`` coalesces concurrent async
+requests into such batches and runs them on a thread pool so the event loop
+never blocks on inference.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+MODEL_PATH = Path(__file__).resolve().parents[1] / "nlp_training" / "model.joblib"
+
+
+class ClassifierService:
+    """Keeps a classifier pipeline loaded and reloads it when the file changes."""
+
+    def __init__(self, path=MODEL_PATH, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._model = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._model is not None or self.path.exists()
+
+    @property
+    def model(self):
+        now = time.monotonic()
+        if self._model is not None and now - self._checked_at < self.check_interval:
+            return self._model
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                if self._model is None:
+                    raise
+                return self._model
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp != self._stamp:
+                try:
+                    model = joblib.load(self.path)
+                except Exception:
+                    if self._model is None:
+                        raise
+                    return self._model  # partially written file; retry on the next check
+                self._model, self._stamp = model, stamp
+                self.reloads += 1
+            return self._model
+
+    def classify_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Label every text with one vectorized ``predict_proba`` call."""
+        if not texts:
+            return []
+        model = self.model
+        if not hasattr(model, "predict_proba"):
+            return [{"label": str(label), "confidence": None} for label in model.predict(texts)]
+
+        proba = model.predict_proba(texts)
+        classes = [str(c) for c in model.classes_]
+        best = proba.argmax(axis=1)
+        confidence = proba[np.arange(len(texts)), best]
+        return [
+            {
+                "label": classes[b],
+                "confidence": float(c),
+                "probabilities": dict(zip(classes, row.tolist())),
+            }
+            for b, c, row in zip(best.tolist(), confidence.tolist(), proba)
+        ]
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        return self.classify_batch([text])[0]
+
+
+class MicroBatcher:
+    """Coalesces concurrent ``submit`` calls into one call of ``fn`` per batch.
+
+    A batch is flushed when it holds ``max_batch`` items or ``max_delay``
+    seconds after its first item arrived, whichever comes first.  ``fn`` runs
+    on ``executor`` and must map a list of items to a list of results.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], List[Any]],
+        max_batch: int = 64,
+        max_delay: float = 0.005,
+        executor: Optional[Executor] = None,
+    ):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="classify")
+        self.batches = 0
+        self._pending: List[Tuple[List[Any], asyncio.Future]] = []
+        self._pending_items = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, items: List[Any]) -> List[Any]:
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((items, future))
+        self._pending_items += len(items)
+
+        if self._pending_items >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    async def submit_one(self, item: Any) -> Any:
+        return (await self.submit([item]))[0]
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_items = self._pending, [], 0
+        asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[List[Any], asyncio.Future]]):
+        items = [item for chunk, _ in batch for item in chunk]
+        self.batches += 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for chunk, future in batch:
+            if not future.done():
+                future.set_result(results[offset:offset + len(chunk)])
+            offset += len(chunk)
@@ -0,0 +1,134 @@
+"""Out-of-core training for the text classifiers.
+
+CSV files are read in chunks, vectorized with a stateless
+``HashingVectorizer`` and fed to estimators that support ``partial_fit``,
+so corpora larger than memory can be trained on.
+"""
+
+import time
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import confusion_matrix
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+ESTIMATORS = {
+    "nb": lambda: MultinomialNB(),
+    "logreg": lambda: SGDClassifier(loss="log_loss", random_state=42),
+}
+
+
+def iter_chunks(
+    path: str, chunksize: int, text_col: str = "text", label_col: str = "label"
+) -> Iterator[Tuple[int, pd.Series, pd.Series]]:
+    """Yield ``(row offset, texts, labels)`` for each chunk of the CSV."""
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=[text_col, label_col], chunksize=chunksize):
+        chunk = chunk.dropna()
+        yield offset, chunk[text_col].astype(str), chunk[label_col].astype(str)
+        offset += len(chunk)
+
+
+def scan_classes(path: str, chunksize: int, label_col: str = "label") -> List[str]:
+    """Collect the label set with a pass that reads only the label column."""
+    classes = set()
+    for chunk in pd.read_csv(path, usecols=[label_col], chunksize=chunksize):
+        classes.update(chunk[label_col].dropna().astype(str).unique())
+    return sorted(classes)
+
+
+def holdout_mask(offset: int, size: int, test_size: float) -> np.ndarray:
+    """Deterministic, chunk-size independent train/test split by row number."""
+    rows = np.arange(offset, offset + size, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        bucket = (rows * np.uint64(2654435761)) % np.uint64(1000)
+    return bucket < np.uint64(int(test_size * 1000))
+
+
+def build_streaming_pipeline(estimator: str = "nb", n_features: int = 2 ** 20) -> Pipeline:
+    # alternate_sign=False keeps features non-negative for MultinomialNB
+    return Pipeline([
+        ("hashing", HashingVectorizer(n_features=n_features, alternate_sign=False)),
+        ("clf", ESTIMATORS[estimator]()),
+    ])
+
+
+def _print_progress(stats: dict):
+    print(
+        f"{stats['phase']}: {stats['rows']} rows, "
+        f"{stats['rows_per_sec']:.0f} rows/s, {stats['elapsed']:.1f}s"
+    )
+
+
+def format_report(matrix: np.ndarray, classes: Sequence[str]) -> str:
+    """Precision/recall/F1 table from an accumulated confusion matrix."""
+    lines = [f"{'':>14} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}"]
+    for i, label in enumerate(classes):
+        tp = matrix[i, i]
+        predicted, support = matrix[:, i].sum(), matrix[i, :].sum()
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        lines.append(f"{label:>14} {precision:>9.2f} {recall:>9.2f} {f1:>9.2f} {support:>9}")
+    total = matrix.sum()
+    accuracy = np.trace(matrix) / total if total else 0.0
+    lines.append(f"\n{'accuracy':>14} {'':>9} {'':>9} {accuracy:>9.2f} {total:>9}")
+    return "\n".join(lines)
+
+
+def stream_train(
+    path: str,
+    estimator: str = "nb",
+    chunksize: int = 10000,
+    classes: Optional[Sequence[str]] = None,
+    test_size: float = 0.2,
+    n_features: int = 2 ** 20,
+    text_col: str = "text",
+    label_col: str = "label",
+    progress: Optional[Callable[[dict], None]] = _print_progress,
+) -> Tuple[Pipeline, np.ndarray, List[str]]:
+    """Train chunk by chunk, then evaluate on the held-out rows in a second pass.
+
+    Returns the fitted pipeline, the confusion matrix over the held-out rows
+    and the class order used for it.
+    """
+    classes = list(classes) if classes is not None else scan_classes(path, chunksize, label_col)
+    pipeline = build_streaming_pipeline(estimator, n_features)
+    vectorizer, clf = pipeline.named_steps["hashing"], pipeline.named_steps["clf"]
+
+    def report(phase, rows, start):
+        if progress:
+            elapsed = time.perf_counter() - start
+            progress({
+                "phase": phase,
+                "rows": rows,
+                "elapsed": elapsed,
+                "rows_per_sec": rows / elapsed if elapsed else 0.0,
+            })
+
+    start, rows, fitted = time.perf_counter(), 0, False
+    for offset, texts, labels in iter_chunks(path, chunksize, text_col, label_col):
+        train = ~holdout_mask(offset, len(texts), test_size)
+        if train.any():
+            clf.partial_fit(vectorizer.transform(texts[train]), labels[train], classes=classes)
+            fitted = True
+        rows += len(texts)
+        report("train", rows, start)
+
+    matrix = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    if not fitted:
+        raise ValueError(f"No training rows found in {path}")
+    start, rows = time.perf_counter(), 0
+    for offset, texts, labels in iter_chunks(path, chunksize, text_col, label_col):
+        test = holdout_mask(offset, len(texts), test_size)
+        if test.any():
+            predicted = clf.predict(vectorizer.transform(texts[test]))
+            matrix += confusion_matrix(labels[test], predicted, labels=classes)
+        rows += len(texts)
+        report("evaluate", rows, start)
+
+    return pipeline, matrix, classes
@@ -1,34 +1,29 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-
-
-def load_data(path: str) -> pd.DataFrame:
-    """Load CSV dataset."""
-    return pd.read_csv(path)
-
-
-def build_pipeline():
-    return Pipeline([
-        ("tfidf", TfidfVectorizer()),
-        ("clf", MultinomialNB()),
-    ])
-
-
-def train(path: str = "nlp/narratis_dataset.csv"):
-    data = load_data(path)
-    X_train, X_test, y_train, y_test = train_test_split(
-        data["text"], data["label"], test_size=0.2, random_state=42
+import argparse
+
+try:
+    from nlp import engine
+except ImportError:  # run as a script: python nlp/train_model.py
+    import engine
+
+
+def train(
+    path: str = "nlp/narratis_dataset.csv",
+    stream: bool = False,
+    chunksize: int = 10000,
+    search: bool = False,
+    jobs: int = None,
+):
+    return engine.search_and_train(
+        path, "nb", search=search, n_jobs=jobs, stream=stream, chunksize=chunksize
     )
-    model = build_pipeline()
-    model.fit(X_train, y_train)
-    predictions = model.predict(X_test)
-    print(classification_report(y_test, predictions))
-    return model
 
 
 if __name__ == "__main__":
-    train("nlp/narratis_dataset.csv")
+    parser = argparse.ArgumentParser(description="Train the NARRATIS narrative classifier")
+    parser.add_argument("path", nargs="?", default="nlp/narratis_dataset.csv")
+    parser.add_argument("--stream", action="store_true", help="train out-of-core in chunks")
+    parser.add_argument("--chunksize", type=int, default=10000)
+    parser.add_argument("--search", action="store_true", help="cross-validate a hyperparameter grid first")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for --search")
+    args = parser.parse_args()
+    train(args.path, stream=args.stream, chunksize=args.chunksize, search=args.search, jobs=args.jobs)
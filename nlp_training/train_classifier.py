@@ -1,38 +1,33 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
+import argparse
+import sys
+
 import joblib
 from pathlib import Path
 
-DATA_PATH = Path(__file__).parent / 'data' / 'mathe_magic.csv'
-MODEL_PATH = Path(__file__).parent / 'model.joblib'
-
+# Ensure the project root is in the Python path so `nlp` can be imported
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def load_data(path=DATA_PATH):
-    df = pd.read_csv(path)
-    return df['text'], df['label']
+from nlp import engine
 
-
-def build_pipeline():
-    return Pipeline([
-        ('tfidf', TfidfVectorizer()),
-        ('clf', LogisticRegression(max_iter=1000))
-    ])
+DATA_PATH = Path(__file__).parent / 'data' / 'mathe_magic.csv'
+MODEL_PATH = Path(__file__).parent / 'model.joblib'
 
 
-def train():
-    X, y = load_data()
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    pipeline = build_pipeline()
-    pipeline.fit(X_train, y_train)
-    y_pred = pipeline.predict(X_test)
-    print(classification_report(y_test, y_pred))
+def train(path=DATA_PATH, stream=False, chunksize=10000, search=False, jobs=None):
+    # With --stream, SGD with log loss stands in for LogisticRegression
+    pipeline = engine.search_and_train(
+        path, 'logreg', search=search, n_jobs=jobs, stream=stream, chunksize=chunksize
+    )
     joblib.dump(pipeline, MODEL_PATH)
     print(f"Model saved to {MODEL_PATH}")
 
 
 if __name__ == '__main__':
-    train()
+    parser = argparse.ArgumentParser(description='Train the mathe-magic text classifier')
+    parser.add_argument('path', nargs='?', default=DATA_PATH)
+    parser.add_argument('--stream', action='store_true', help='train out-of-core in chunks')
+    parser.add_argument('--chunksize', type=int, default=10000)
+    parser.add_argument('--search', action='store_true', help='cross-validate a hyperparameter grid first')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes for --search')
+    args = parser.parse_args()
+    train(args.path, stream=args.stream, chunksize=args.chunksize, search=args.search, jobs=args.jobs)
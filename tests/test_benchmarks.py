@@ -0,0 +1,46 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from benchmarks.fake_kernel import FakeKernelDaemon
+from benchmarks.run_benchmarks import bench_chat_latency, bench_ws_fanout, compare, percentile
+
+def test_fake_kernel_lines_parse():
+    daemon = FakeKernelDaemon()
+    event = echodaemon.parse_kernel_line(daemon.format_line(7).strip())
+    assert event.source == 'KERNEL'
+    assert event.message.endswith('#7')
+
+def test_ws_fanout_counts_every_client():
+    params = {'fanout_clients': [3], 'fanout_messages': 5}
+    results = asyncio.run(bench_ws_fanout(params))
+    assert results['clients_3_deliveries_per_sec'] > results['clients_3_broadcasts_per_sec']
+
+def test_chat_latency_runs_past_rate_limit():
+    # More requests than the default per-address burst, all from one address
+    params = {'chat_requests': 8, 'chat_concurrency': 2, 'llm_latency': 0.0}
+    admission = echodaemon.chat_admission
+    results = asyncio.run(bench_chat_latency(params))
+    assert results['requests_per_sec'] > 0
+    assert results['p50_ms'] <= results['max_ms']
+    assert echodaemon.chat_admission is admission
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {'results': {'s': {'a_per_sec': 100.0, 'b_ms': 10.0}}}
+    current = {'results': {'s': {'a_per_sec': 80.0, 'b_ms': 9.0}}}
+    rows = {row['metric']: row for row in compare(current, baseline)}
+    assert rows['a_per_sec']['regression']
+    assert not rows['b_ms']['regression']
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    # Rank is ceil(p/100 * n); round-half-to-even would pick 8 here
+    assert percentile(list(range(1, 11)), 85) == 9
+    assert percentile(list(range(1, 11)), 100) == 10
@@ -0,0 +1,144 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from echodaemon import AdmissionRejected, ChatAdmissionController
+
+def test_queue_full_is_shed_with_retry_after():
+    async def scenario():
+        controller = ChatAdmissionController(max_concurrent=1, max_queue=1)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire()
+        controller.release(0.5)
+        await waiter
+        return exc.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.retry_after > 0
+
+def test_higher_priority_is_served_first():
+    async def scenario():
+        controller = ChatAdmissionController(max_concurrent=1)
+        order = []
+        await controller.acquire()
+
+        async def request(name, priority):
+            await controller.acquire(priority=priority)
+            order.append(name)
+            controller.release()
+
+        tasks = [
+            asyncio.create_task(request('low', 0)),
+            asyncio.create_task(request('high', 5)),
+        ]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ['high', 'low']
+
+def test_queue_deadline_expires():
+    async def scenario():
+        controller = ChatAdmissionController(max_concurrent=1, queue_timeout=0.01)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire()
+        return controller, exc.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert controller.stats()['queued'] == 0
+    assert controller.stats()['expired'] == 1
+
+def test_queue_position_is_reported():
+    async def scenario():
+        messages = []
+
+        async def notify(client_id, message):
+            messages.append((client_id, message))
+
+        controller = ChatAdmissionController(max_concurrent=1, notify=notify)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire('alice'))
+        await asyncio.sleep(0.01)
+        controller.release()
+        await waiter
+        return messages
+
+    messages = asyncio.run(scenario())
+    client_id, message = messages[0]
+    assert client_id == 'alice'
+    assert message['type'] == 'chat_queue'
+    assert message['data']['position'] == 1
+
+def test_chat_endpoint_rate_limits_per_client(monkeypatch):
+    controller = ChatAdmissionController(client_rate=0.001, client_burst=1)
+    monkeypatch.setattr(echodaemon, 'chat_admission', controller)
+    monkeypatch.setattr(echodaemon.ai_core, 'model_url', 'http://127.0.0.1:9')
+
+    with TestClient(echodaemon.app) as client:
+        first = client.post('/api/chat', json={'message': 'hi', 'client_id': 'c1'})
+        second = client.post('/api/chat', json={'message': 'hi', 'client_id': 'c1'})
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers['Retry-After']) >= 1
+
+def test_fresh_client_ids_do_not_bypass_rate_limit(monkeypatch):
+    controller = ChatAdmissionController(client_rate=0.001, client_burst=1)
+    monkeypatch.setattr(echodaemon, 'chat_admission', controller)
+    monkeypatch.setattr(echodaemon.ai_core, 'model_url', 'http://127.0.0.1:9')
+
+    with TestClient(echodaemon.app) as client:
+        statuses = [
+            client.post('/api/chat', json={'message': 'hi', 'client_id': f'c{i}'}).status_code
+            for i in range(3)
+        ]
+
+    assert statuses == [200, 429, 429]
+
+def test_anonymous_clients_are_rate_limited_by_address(monkeypatch):
+    controller = ChatAdmissionController(client_rate=0.001, client_burst=1)
+    monkeypatch.setattr(echodaemon, 'chat_admission', controller)
+    monkeypatch.setattr(echodaemon.ai_core, 'model_url', 'http://127.0.0.1:9')
+
+    with TestClient(echodaemon.app) as client:
+        statuses = [client.post('/api/chat', json={'message': 'hi'}).status_code for _ in range(4)]
+
+    assert statuses == [200, 429, 429, 429]
+
+def test_priority_is_clamped():
+    async def scenario():
+        controller = ChatAdmissionController(max_concurrent=1, max_priority=3)
+        order = []
+        await controller.acquire()
+
+        async def request(name, priority):
+            await controller.acquire(priority=priority)
+            order.append(name)
+            controller.release()
+
+        tasks = [
+            asyncio.create_task(request('capped', 3)),
+            asyncio.create_task(request('greedy', 10 ** 9)),
+        ]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    # Both clamp to 3, so arrival order wins
+    assert asyncio.run(scenario()) == ['capped', 'greedy']
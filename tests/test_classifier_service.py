@@ -0,0 +1,69 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import joblib
+from fastapi.testclient import TestClient
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from nlp import engine
+from nlp.service import ClassifierService, MicroBatcher
+
+def train_model(tmp_path):
+    lines = ['text,label']
+    for i in range(40):
+        lines.append(f'"the spell conjures spirit {i}",magic' if i % 2 else f'"the cluster replicates shard {i}",technology')
+    corpus = tmp_path / 'corpus.csv'
+    corpus.write_text('\n'.join(lines) + '\n')
+    path = tmp_path / 'model.joblib'
+    joblib.dump(engine.train(corpus, 'logreg', cache_dir=tmp_path / 'cache', report=False), path)
+    return path
+
+def test_classify_batch_returns_labels_and_probabilities(tmp_path):
+    service = ClassifierService(train_model(tmp_path))
+    results = service.classify_batch(['a spell of spirit', 'shard cluster'])
+    assert [r['label'] for r in results] == ['magic', 'technology']
+    assert results[0]['confidence'] == max(results[0]['probabilities'].values())
+    assert service.reloads == 1
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def fn(items):
+        calls.append(list(items))
+        return [item.upper() for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(fn, max_batch=100, max_delay=0.01)
+        single = [batcher.submit_one(f'text{i}') for i in range(20)]
+        bulk = batcher.submit(['a', 'b'])
+        return await asyncio.gather(*single, bulk)
+
+    results = asyncio.run(scenario())
+    assert results[:3] == ['TEXT0', 'TEXT1', 'TEXT2']
+    assert results[-1] == ['A', 'B']
+    assert len(calls) == 1 and len(calls[0]) == 22
+
+def test_micro_batcher_flushes_when_full():
+    calls = []
+
+    async def scenario():
+        batcher = MicroBatcher(lambda items: calls.append(len(items)) or items, max_batch=4, max_delay=10)
+        return await asyncio.gather(*(batcher.submit_one(i) for i in range(8)))
+
+    assert asyncio.run(scenario()) == list(range(8))
+    assert calls == [4, 4]
+
+def test_classify_endpoint(tmp_path, monkeypatch):
+    service = ClassifierService(train_model(tmp_path))
+    monkeypatch.setattr(echodaemon, 'classifier_service', service)
+    monkeypatch.setattr(echodaemon, 'classify_batcher', MicroBatcher(service.classify_batch))
+
+    with TestClient(echodaemon.app) as client:
+        resp = client.post('/api/classify', json={'texts': ['a spell of spirit']})
+
+    assert resp.status_code == 200
+    assert resp.json()['results'][0]['label'] == 'magic'
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from memory.store import ContinuityStore
+
+PACKET = '''# Ledger
+
+```yaml
+session_date: 2026-05-01
+session_context: {context}
+active_modes: [Primary]
+changes: [Tuned the lantern protocol]
+stable: []
+tensions: []
+opened_loops: []
+closed_loops: []
+artifacts_touched: []
+recommended_next_steps: []
+```
+'''
+
+def make_tree(root):
+    (root / 'schemas').mkdir(parents=True)
+    (root / 'schemas' / 'residue-schema.yaml').write_text(
+        (ROOT_DIR / 'continuity' / 'schemas' / 'residue-schema.yaml').read_text()
+    )
+    (root / 'memory' / 'anchors').mkdir(parents=True)
+    (root / 'memory' / 'ledger').mkdir(parents=True)
+    (root / 'memory' / 'anchors' / 'motifs.md').write_text(
+        '# Motifs\n\n## Lanterns\nThe lantern motif marks recall.\n\n## Rivers\nRivers mark drift.\n'
+    )
+    (root / 'memory' / 'ledger' / 'day1.md').write_text(PACKET.format(context='Lantern session'))
+    return ContinuityStore(root, check_interval=0)
+
+def test_only_changed_files_are_reindexed(tmp_path):
+    store = make_tree(tmp_path)
+    store.refresh()
+    assert store.stats()['files_indexed'] == 2
+    assert len(store.residues) == 1
+
+    motifs = tmp_path / 'memory' / 'anchors' / 'motifs.md'
+    stat = os.stat(motifs)
+    os.utime(motifs, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store.refresh()
+    assert store.stats()['files_indexed'] == 2  # touched, same hash
+
+    motifs.write_text('# Motifs\n\n## Embers\nEmbers mark warmth.\n')
+    store.refresh()
+    assert store.stats()['files_indexed'] == 3
+    assert store.search('lantern')[0]['kind'] == 'residue'
+    assert store.search('embers')[0]['title'] == 'Motifs / Embers'
+
+    (tmp_path / 'memory' / 'ledger' / 'day1.md').unlink()
+    store.refresh()
+    assert store.search('lantern') == []
+    assert not store.residues
+
+def test_invalid_residue_packet_is_reported(tmp_path):
+    store = make_tree(tmp_path)
+    (tmp_path / 'memory' / 'ledger' / 'bad.md').write_text(
+        PACKET.format(context='Broken').replace('session_date: 2026-05-01', 'session_date: someday')
+    )
+    store.refresh()
+    assert 'memory/ledger/bad.md' in store.invalid
+    assert len(store.residues) == 1
+
+def test_context_respects_token_budget(tmp_path):
+    store = make_tree(tmp_path)
+    assert len(store.context('lantern recall drift', k=5, token_budget=10_000)) == 3
+    picked = store.context('lantern recall drift', k=5, token_budget=10)
+    assert sum(len(m['text']) for m in picked) <= 40
+
+def test_ai_core_injects_memories_into_system_prompt(tmp_path, monkeypatch):
+    store = make_tree(tmp_path)
+    sent = {}
+
+    class Reply:
+        status_code = 200
+
+        def json(self):
+            return {'choices': [{'text': 'ok'}], 'usage': {'total_tokens': 1}}
+
+    def fake_post(url, json, timeout):
+        sent.update(json)
+        return Reply()
+
+    monkeypatch.setattr(echodaemon.requests, 'post', fake_post)
+    core = echodaemon.AICore(memory_store=store)
+    response = asyncio.run(core.generate_response('tell me about the lantern'))
+
+    persona_block, memory_block = sent['prompt'].split('<|eot_id|>')[:2]
+    assert persona_block == '<|begin_of_text|>' + core._system_block[:-len('<|eot_id|>')]
+    assert memory_block.startswith('<|start_header_id|>system<|end_header_id|>\nRelevant continuity memories')
+    assert 'lantern' in memory_block
+    assert response.memories and response.memories[0].startswith('memory/')
+    assert 'continuity memories' not in core.conversation_history[0]['content']
+
+def test_memory_search_endpoint():
+    with TestClient(echodaemon.app) as client:
+        resp = client.get('/api/memory/search', params={'q': 'unfinished threads', 'k': 2})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert len(body['results']) == 2
+    assert body['index']['residue_packets'] >= 1
+
+def test_telemetry_context_does_not_steer_retrieval(monkeypatch):
+    store = ContinuityStore(ROOT_DIR / 'continuity', check_interval=60)
+    search, queries = store.context, []
+
+    def recording_context(query, k, budget):
+        queries.append(query)
+        return search(query, k, budget)
+
+    class Reply:
+        status_code = 200
+
+        def json(self):
+            return {'choices': [{'text': 'ok'}], 'usage': {'total_tokens': 1}}
+
+    monkeypatch.setattr(echodaemon.requests, 'post', lambda url, json, timeout: Reply())
+    monkeypatch.setattr(store, 'context', recording_context)
+    core = echodaemon.AICore(memory_store=store)
+    context = {
+        'kernel_events': [{}] * 5,
+        'system_metrics': {'cpu_usage': 12.0, 'memory_usage': 40.0},
+    }
+    plain = asyncio.run(core.generate_response('what is the weather'))
+    with_context = asyncio.run(core.generate_response('what is the weather', context))
+
+    assert queries == ['what is the weather', 'what is the weather']
+    assert plain.memories == with_context.memories
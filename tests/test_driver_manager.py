@@ -0,0 +1,102 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from echodaemon import DRIVER_ACTIVE, DRIVER_FAILED, DriverManager, HardwareInventory
+
+class FakeKernel:
+    def __init__(self, succeed=True, delay=0.01):
+        self.commands = []
+        self.succeed = succeed
+        self.delay = delay
+
+    async def send_command(self, command):
+        self.commands.append(command)
+        await asyncio.sleep(self.delay)
+        return self.succeed
+
+def make_manager(tmp_path, **kwargs):
+    kernel = FakeKernel(**kwargs)
+    inventory = HardwareInventory(root=str(tmp_path / 'missing'))
+    return kernel, DriverManager(kernel, inventory)
+
+def test_duplicate_loads_are_collapsed(tmp_path):
+    kernel, manager = make_manager(tmp_path)
+
+    async def scenario():
+        return await asyncio.gather(*(manager.load_driver('nic0') for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert all(r['success'] for r in results)
+    assert kernel.commands == ['insmod driver_nic0.ko']
+    assert manager.driver_state('nic0') == DRIVER_ACTIVE
+    assert manager.loaded_drivers['nic0']['load_count'] == 1
+
+def test_load_and_unload_are_serialized_per_signature(tmp_path):
+    kernel, manager = make_manager(tmp_path)
+
+    async def scenario():
+        return await asyncio.gather(manager.load_driver('nic0'), manager.unload_driver('nic0'))
+
+    loaded, unloaded = asyncio.run(scenario())
+    assert loaded['success'] and unloaded['success']
+    assert kernel.commands == ['insmod driver_nic0.ko', 'rmmod driver_nic0']
+    assert 'nic0' not in manager.loaded_drivers
+
+def test_unload_of_unloaded_driver_sends_nothing(tmp_path):
+    kernel, manager = make_manager(tmp_path)
+    result = asyncio.run(manager.unload_driver('nic0'))
+    assert not result['success']
+    assert kernel.commands == []
+
+def test_bulk_runs_in_parallel(tmp_path):
+    kernel, manager = make_manager(tmp_path, delay=0.05)
+    signatures = [f'dev{i}' for i in range(100)]
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await manager.bulk('load', signatures, max_parallel=100)
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(scenario())
+    assert len(results) == 100 and all(r['success'] for r in results)
+    assert elapsed < 1.0
+    assert set(manager.loaded_drivers) == set(signatures)
+
+def test_failed_load_can_be_retried(tmp_path):
+    kernel, manager = make_manager(tmp_path, succeed=False)
+    assert not asyncio.run(manager.load_driver('nic0'))['success']
+    assert manager.driver_state('nic0') == DRIVER_FAILED
+
+    kernel.succeed = True
+    assert asyncio.run(manager.load_driver('nic0'))['success']
+    assert manager.driver_state('nic0') == DRIVER_ACTIVE
+
+def test_load_after_queued_unload_is_not_merged(tmp_path):
+    kernel, manager = make_manager(tmp_path)
+
+    async def scenario():
+        return await asyncio.gather(
+            manager.load_driver('nic0'), manager.unload_driver('nic0'), manager.load_driver('nic0')
+        )
+
+    first, unloaded, last = asyncio.run(scenario())
+    assert first['success'] and unloaded['success'] and last['success']
+    assert kernel.commands == ['insmod driver_nic0.ko', 'rmmod driver_nic0', 'insmod driver_nic0.ko']
+    assert manager.driver_state('nic0') == DRIVER_ACTIVE
+
+def test_driver_bound_at_startup_can_be_unloaded(tmp_path):
+    kernel = FakeKernel()
+    manager = DriverManager(kernel, HardwareInventory(root=str(tmp_path / 'missing')))
+    assert manager.driver_state('tsm_amd_nvme_7901') == DRIVER_ACTIVE
+
+    result = asyncio.run(manager.unload_driver('tsm_amd_nvme_7901'))
+    assert result['success']
+    assert kernel.commands == ['rmmod driver_tsm_amd_nvme_7901']
+    hardware = asyncio.run(manager.scan_hardware())
+    assert not next(d for d in hardware if d['signature'] == 'tsm_amd_nvme_7901')['driver_loaded']
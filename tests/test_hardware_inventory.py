@@ -0,0 +1,53 @@
+import os
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from echodaemon import HardwareInventory, SIMULATED_HARDWARE
+
+def make_device(root, address, vendor, device, class_code, driver=None):
+    path = root / address
+    path.mkdir(parents=True)
+    (path / 'vendor').write_text(vendor + '\n')
+    (path / 'device').write_text(device + '\n')
+    (path / 'class').write_text(class_code + '\n')
+    if driver:
+        os.symlink(f'../../../bus/pci/drivers/{driver}', path / 'driver')
+    return path
+
+def test_reads_and_indexes_sysfs(tmp_path):
+    make_device(tmp_path, '0000:00:1f.6', '0x8086', '0x15b7', '0x020000', driver='e1000e')
+    make_device(tmp_path, '0000:01:00.0', '0x10de', '0x2684', '0x030000')
+    inventory = HardwareInventory(root=str(tmp_path), min_refresh_interval=0)
+
+    devices = inventory.devices()
+    assert [d['type'] for d in devices] == ['network', 'display']
+    assert devices[0]['driver'] == 'e1000e'
+    assert devices[0]['driver_loaded']
+    assert inventory.find('0x10de', '0x2684')[0]['address'] == '0000:01:00.0'
+    assert inventory.get(devices[1]['signature']) is devices[1]
+
+def test_unchanged_devices_are_not_reread(tmp_path, monkeypatch):
+    make_device(tmp_path, '0000:00:1f.6', '0x8086', '0x15b7', '0x020000')
+    inventory = HardwareInventory(root=str(tmp_path), min_refresh_interval=0)
+    inventory.devices()
+
+    reads = []
+    original = inventory._read_device
+    monkeypatch.setattr(inventory, '_read_device', lambda a: reads.append(a) or original(a))
+    inventory.devices()
+    assert reads == []
+
+    make_device(tmp_path, '0000:02:00.0', '0x1022', '0x7901', '0x010802')
+    os.utime(tmp_path, (1, 1))  # force a distinct directory mtime
+    assert len(inventory.devices()) == 2
+    assert reads == ['0000:02:00.0']
+
+def test_falls_back_to_simulated_hardware(tmp_path):
+    inventory = HardwareInventory(root=str(tmp_path / 'missing'))
+    devices = inventory.devices()
+    assert inventory.simulated
+    assert [d['signature'] for d in devices] == [d['signature'] for d in SIMULATED_HARDWARE]
@@ -0,0 +1,70 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from echodaemon import RepeatSuppressionFilter
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    echodaemon.shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_records_are_written_as_json_by_the_listener(tmp_path, restore_root_logger):
+    echodaemon.setup_logging(tmp_path)
+    logging.info('Client %s connected', 'abc')
+    echodaemon.shutdown_logging()
+
+    records = read_records(tmp_path / 'echodaemon.log')
+    assert records[-1]['message'] == 'Client abc connected'
+    assert records[-1]['level'] == 'INFO'
+
+def test_error_floods_are_suppressed(tmp_path, restore_root_logger):
+    echodaemon.setup_logging(tmp_path)
+    for i in range(100):
+        logging.error('Failed to broadcast to client: %s', i)
+    echodaemon.shutdown_logging()
+
+    flood = [r for r in read_records(tmp_path / 'echodaemon.log') if r['message'].startswith('Failed')]
+    assert len(flood) == 5
+
+def test_suppressed_count_is_reported_after_the_window():
+    rate_filter = RepeatSuppressionFilter(burst=1, interval=0.0)
+    record = logging.LogRecord('x', logging.ERROR, __file__, 1, 'boom %s', (1,), None)
+    assert rate_filter.filter(record)
+
+    rate_filter.interval = 60
+    assert not rate_filter.filter(logging.makeLogRecord(record.__dict__))
+    assert not rate_filter.filter(logging.makeLogRecord(record.__dict__))
+
+    rate_filter.interval = 0
+    later = logging.makeLogRecord({**record.__dict__, 'suppressed': 0})
+    assert rate_filter.filter(later)
+    assert later.suppressed == 2
+
+def test_log_file_rotates_by_size(tmp_path, restore_root_logger):
+    echodaemon.setup_logging(tmp_path, max_bytes=2000, backup_count=2)
+    for i in range(200):
+        logging.info('Client %s connected', i)
+    echodaemon.shutdown_logging()
+
+    assert (tmp_path / 'echodaemon.log.1').exists()
+    assert not (tmp_path / 'echodaemon.log.3').exists()
+    assert (tmp_path / 'echodaemon.log').stat().st_size <= 2000
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ensure the project root is in the Python path so `training` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from training.mathemagic import (
+    digit_sum_big,
+    digit_sum_magic,
+    digit_sum_magic_batch,
+    digit_sum_magic_big,
+    digit_sum_magic_file,
+    digit_sums,
+    digital_root,
+    digital_roots,
+)
+
+def test_batch_matches_scalar():
+    numbers = np.array([0, 7, 10, 19, 99, 12345, 999999999999, 2 ** 62, -5])
+    batch = digit_sum_magic_batch(numbers)
+    for n, result, steps in zip(numbers.tolist(), batch['result'], batch['steps']):
+        info = digit_sum_magic(n)
+        assert result == info['result']
+        assert steps == len(info['steps'])
+    assert digital_roots(numbers).tolist() == batch['result'].tolist()
+    assert 'steps' not in digit_sum_magic_batch(numbers, steps=False)
+
+def test_negative_and_out_of_range_input_is_rejected():
+    with pytest.raises(ValueError):
+        digit_sum_big(-5)
+    with pytest.raises(ValueError):
+        digit_sums([12, -1])
+    with pytest.raises(ValueError):
+        digit_sum_magic_batch(np.array([2 ** 63 + 5], dtype=np.uint64))
+    with pytest.raises(ValueError):
+        digit_sum_magic_batch([2 ** 70])
+    # uint64 values that fit are still accepted
+    assert digit_sum_magic_batch(np.array([99], dtype=np.uint64))['result'].tolist() == [9]
+
+def test_big_integers_without_str():
+    number = 7 ** 4000  # ~3400 digits, still within the default str() limit for checking
+    assert digit_sum_big(number) == sum(int(d) for d in str(number))
+    info = digit_sum_magic(number)
+    assert digit_sum_magic_big(number) == {'result': info['result'], 'steps': len(info['steps'])}
+    assert digital_root(number) == info['result']
+
+def test_file_stream_handles_lines_across_blocks(tmp_path):
+    numbers = [5, 10, 7 ** 300, 0, 99999]
+    path = tmp_path / 'numbers.txt'
+    path.write_text('\n'.join(str(n) for n in numbers[:3]) + '\n\n007\n' + '\n'.join(str(n) for n in numbers[3:]))
+
+    info = digit_sum_magic_file(path, block_size=16)
+    expected = [digit_sum_magic(n) for n in numbers[:3] + [7] + numbers[3:]]
+    assert info['result'].tolist() == [e['result'] for e in expected]
+    assert info['steps'].tolist() == [len(e['steps']) for e in expected]
+
+def test_file_blocks_mix_short_and_long_lines(tmp_path):
+    numbers = [12, 10 ** 30, 987654321987654321, 7 ** 60, 3]
+    path = tmp_path / 'numbers.txt'
+    path.write_text(' 12\r\n' + '\n'.join(str(n) for n in numbers[1:]) + '\n')
+
+    for block_size in (7, 1 << 20):
+        info = digit_sum_magic_file(path, block_size=block_size)
+        expected = [digit_sum_magic(n) for n in numbers]
+        assert info['result'].tolist() == [e['result'] for e in expected]
+        assert info['steps'].tolist() == [len(e['steps']) for e in expected]
+
+def test_file_rejects_non_decimal_lines(tmp_path):
+    path = tmp_path / 'numbers.txt'
+    path.write_text('12\n-5\n')
+    with pytest.raises(ValueError):
+        digit_sum_magic_file(path)
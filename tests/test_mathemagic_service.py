@@ -0,0 +1,72 @@
+import os
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from ml.train_mathemagic import load_data, save_index, save_model, train_index, train_model
+from ml.use_model import ModelService
+
+def train_to(out_dir, codes_suffix=''):
+    prompts, codes = load_data(str(ROOT_DIR / 'ml' / 'training_data.json'))
+    vect, clf, codes = train_model(prompts, [c + codes_suffix for c in codes])
+    return save_model(vect, clf, codes, out_dir=str(out_dir))
+
+def test_batch_query_loads_model_once(tmp_path):
+    service = ModelService(train_to(tmp_path), check_interval=60)
+    codes = service.query_batch(['sort a list', 'compute the factorial of n'])
+    assert codes[0] == 'sorted_list = sorted(my_list)'
+    assert 'factorial' in codes[1]
+    service.query('sort a list')
+    assert service.reloads == 1
+
+def test_hot_reload_when_model_file_changes(tmp_path):
+    path = train_to(tmp_path)
+    service = ModelService(path, check_interval=0)
+    assert service.query('sort a list') == 'sorted_list = sorted(my_list)'
+
+    train_to(tmp_path, codes_suffix='  # v2')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert service.query('sort a list').endswith('# v2')
+    assert service.reloads == 2
+
+def test_index_backed_service_returns_scores(tmp_path):
+    prompts, codes = load_data(str(ROOT_DIR / 'ml' / 'training_data.json'))
+    service = ModelService(save_index(train_index(prompts, codes), out_dir=str(tmp_path)))
+    matches = service.search_batch(['sort a list'], k=2)[0]
+    assert matches[0]['code'] == 'sorted_list = sorted(my_list)'
+    assert matches[0]['score'] > matches[1]['score']
+
+def test_index_reports_no_mmap(tmp_path):
+    prompts, codes = load_data(str(ROOT_DIR / 'ml' / 'training_data.json'))
+    service = ModelService(save_index(train_index(prompts, codes), out_dir=str(tmp_path)), mmap_mode='r')
+    service.query('sort a list')
+    assert service.info()['mmap_mode'] is None
+
+def test_mathemagic_endpoint(tmp_path, monkeypatch):
+    prompts, codes = load_data(str(ROOT_DIR / 'ml' / 'training_data.json'))
+    path = Path(save_index(train_index(prompts, codes), out_dir=str(tmp_path)))
+    monkeypatch.setattr(echodaemon, 'MATHEMAGIC_MODEL_PATH', path)
+    monkeypatch.setattr(echodaemon, 'mathemagic_service', ModelService(path))
+
+    with TestClient(echodaemon.app) as client:
+        resp = client.post('/api/mathemagic', json={'prompts': ['sort a list'], 'k': 3})
+
+    assert resp.status_code == 200
+    result = resp.json()['results'][0]
+    assert result['code'] == 'sorted_list = sorted(my_list)'
+    assert 1 < len(result['matches']) <= 3
+
+def test_mathemagic_endpoint_rejects_out_of_range_k():
+    with TestClient(echodaemon.app) as client:
+        statuses = [
+            client.post('/api/mathemagic', json={'prompts': ['sort a list'], 'k': k}).status_code
+            for k in (-5, -1, 0, 51)
+        ]
+    assert statuses == [422, 422, 422, 422]
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from echodaemon import MetricsHistory, SystemMetrics, SystemMonitor
+
+T0 = 1_700_000_000 - 1_700_000_000 % 3600
+
+def fill(history, seconds, step=5):
+    for i in range(0, seconds, step):
+        history.record(T0 + i, {'cpu_usage': i % 60, 'memory_usage': 50})
+
+def test_rollups_keep_min_max_avg():
+    history = MetricsHistory()
+    fill(history, 2 * 3600 + 120)
+
+    minutes = history.query(T0, T0 + 3600, resolution='1m')
+    assert len(minutes['time']) == 61
+    assert minutes['cpu_usage']['min'][0] == 0
+    assert minutes['cpu_usage']['max'][0] == 55
+    assert minutes['cpu_usage']['avg'][0] == 27.5
+
+    hours = history.query(T0, T0 + 7200, resolution='1h')
+    assert hours['time'] == [T0, T0 + 3600, T0 + 7200]  # last one is still open
+    assert hours['memory_usage']['avg'] == [50, 50, 50]
+
+def test_retention_is_bounded_by_ring_capacity():
+    history = MetricsHistory(raw_capacity=10, minute_capacity=5, hour_capacity=2)
+    fill(history, 4 * 3600)
+    assert history.stats() == {'raw': 10, '1m': 5, '1h': 2}
+    raw = history.query(T0, T0 + 4 * 3600, resolution='raw')
+    assert raw['time'] == [T0 + 4 * 3600 - 5 * (10 - i) for i in range(10)]
+
+def test_resolution_follows_the_requested_range():
+    history = MetricsHistory()
+    fill(history, 3 * 3600)
+    end = T0 + 3 * 3600
+    assert history.query(end - 600, end)['resolution'] == 'raw'
+    assert history.query(end - 3 * 3600, end)['resolution'] == '1m'
+    assert history.query(end - 3 * 3600, end, max_points=10)['resolution'] == '1h'
+    assert len(history.query(end - 600, end, max_points=10)['time']) <= 10
+
+def test_network_counters_are_recorded_as_rates():
+    monitor = SystemMonitor()
+    for i, sent in enumerate([1000, 2000]):
+        metrics = SystemMetrics(1.0, 2.0, {'bytes_sent': sent, 'bytes_recv': 0}, 3.0, 4, [])
+        monitor.record(metrics, ts=T0 + 10 * i)
+    raw = monitor.history.query(T0, T0 + 10, resolution='raw')
+    assert raw['bytes_sent_per_sec']['avg'] == [None, 100]
+    minute = monitor.history.query(T0, T0 + 10, resolution='1m')
+    assert minute['bytes_sent_per_sec']['min'] == [100]
+
+def test_history_endpoint(monkeypatch):
+    history = MetricsHistory()
+    fill(history, 600)
+    monkeypatch.setattr(echodaemon.system_monitor, 'history', history)
+
+    with TestClient(echodaemon.app) as client:
+        resp = client.get('/api/metrics/history', params={'start': T0, 'end': T0 + 600})
+        bad = client.get('/api/metrics/history', params={'resolution': '1d'})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['resolution'] == 'raw'
+    assert len(body['time']) == 120
+    assert bad.status_code == 400
+
+def test_failed_samples_are_skipped():
+    monitor = SystemMonitor()
+    monitor.record(SystemMetrics(10.0, 20.0, {}, 30.0, 40, []), ts=T0)
+    monitor.record(SystemMetrics(0.0, 0.0, {}, 0.0, 0, [], collected=False), ts=T0 + 5)
+    minute = monitor.history.query(T0, T0 + 60, resolution='1m')
+    assert minute['cpu_usage'] == {'min': [10.0], 'max': [10.0], 'avg': [10.0]}
+
+def test_open_buckets_are_included_in_queries():
+    history = MetricsHistory()
+    fill(history, 3600 + 90)  # the 1h bucket for T0 is complete but still open
+    end = T0 + 3600 + 90
+    assert history.query(T0, end, resolution='1h')['time'] == [T0, T0 + 3600]
+    minutes = history.query(end - 120, end, resolution='1m')
+    assert minutes['time'][-1] == T0 + 3600 + 60
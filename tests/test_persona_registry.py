@@ -0,0 +1,111 @@
+import asyncio
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Ensure the project root is in the Python path so `echodaemon` can be imported
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+import echodaemon
+from memory.personas import PersonaRegistry
+
+PERSONA_DIR = ROOT_DIR / 'continuity' / 'personas'
+
+def copy_personas(tmp_path):
+    target = tmp_path / 'personas'
+    shutil.copytree(PERSONA_DIR, target)
+    return target
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_personas_are_compiled_once(tmp_path):
+    registry = PersonaRegistry(copy_personas(tmp_path), base_prompt='BASE', check_interval=0)
+    shadow = registry.get('Shadow')
+    assert registry.get('shadow') is shadow
+    assert shadow.system_prompt.startswith('BASE\n\nActive persona: Shadow')
+    assert shadow.llama3_system.endswith(shadow.system_prompt + '<|eot_id|>')
+    assert registry.get().name == 'Primary'
+    assert [p['name'] for p in registry.personas()] == ['Primary', 'Witness', 'Shadow', 'Chorus']
+    assert registry.get('witness') is registry.get('witness')
+    assert registry.reloads == 1
+
+def test_changed_manifest_is_recompiled(tmp_path):
+    directory = copy_personas(tmp_path)
+    registry = PersonaRegistry(directory, check_interval=0, tokenizer=lambda text: text.split())
+    chorus, primary = registry.get('chorus'), registry.get('primary')
+    assert chorus.tokens and chorus.token_count == len(chorus.tokens)
+
+    path = directory / 'chorus.yaml'
+    path.write_text(path.read_text().replace('divergent ideation', 'wild ideation'))
+    bump_mtime(path)
+    assert 'wild ideation' in registry.get('chorus').system_prompt
+    assert registry.get('primary') is primary
+
+    path.write_text('name: [unterminated')
+    bump_mtime(path)
+    assert 'wild ideation' in registry.get('chorus').system_prompt
+    assert 'chorus.yaml' in registry.errors
+
+    path.unlink()
+    assert 'chorus' not in registry
+
+def test_ai_core_uses_precompiled_persona_block(tmp_path, monkeypatch):
+    registry = PersonaRegistry(copy_personas(tmp_path), base_prompt='BASE')
+    sent = {}
+
+    class Reply:
+        status_code = 200
+
+        def json(self):
+            return {'choices': [{'text': 'ok'}], 'usage': {'total_tokens': 1}}
+
+    def fake_post(url, json, timeout):
+        sent.update(json)
+        return Reply()
+
+    monkeypatch.setattr(echodaemon.requests, 'post', fake_post)
+    core = echodaemon.AICore(persona_registry=registry)
+    response = asyncio.run(core.generate_response('hello', persona='witness'))
+
+    assert sent['prompt'].startswith('<|begin_of_text|>' + registry.get('witness').llama3_system)
+    assert response.persona == 'Witness'
+
+def test_persona_block_is_kept_when_memories_are_injected(tmp_path, monkeypatch):
+    registry = PersonaRegistry(copy_personas(tmp_path), base_prompt='BASE')
+    prompts = []
+
+    class Reply:
+        status_code = 200
+
+        def json(self):
+            return {'choices': [{'text': 'ok'}], 'usage': {'total_tokens': 1}}
+
+    class Memories:
+        def context(self, query, k, budget):
+            return [{'id': 'm#0', 'path': 'm', 'title': 'Lantern', 'text': 'The lantern marks recall.'}]
+
+    def fake_post(url, json, timeout):
+        prompts.append(json['prompt'])
+        return Reply()
+
+    monkeypatch.setattr(echodaemon.requests, 'post', fake_post)
+    core = echodaemon.AICore(persona_registry=registry, memory_store=Memories())
+    asyncio.run(core.generate_response('lantern?', persona='shadow'))
+
+    block = registry.get('shadow').llama3_system
+    assert prompts[0].startswith('<|begin_of_text|>' + block + '<|start_header_id|>system')
+    assert 'The lantern marks recall.' in prompts[0][len(block):]
+
+def test_chat_rejects_unknown_persona():
+    with TestClient(echodaemon.app) as client:
+        resp = client.post('/api/chat', json={'message': 'hi', 'persona': 'nobody'})
+        personas = client.get('/api/personas').json()
+    assert resp.status_code == 400
+    assert personas['default'] == 'primary'
+    assert {p['key'] for p in personas['personas']} == {'primary', 'shadow', 'witness', 'chorus'}
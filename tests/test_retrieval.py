@@ -0,0 +1,64 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from ml.retrieval import SnippetIndex
+
+def load_pairs():
+    with open(ROOT_DIR / 'ml' / 'training_data.json', encoding='utf-8') as f:
+        data = json.load(f)
+    return [d['prompt'] for d in data], [d['code'] for d in data]
+
+def test_scores_match_sklearn_tfidf_cosine():
+    prompts, codes = load_pairs()
+    index = SnippetIndex()
+    index.add(prompts, codes)
+    index.merge()
+
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(prompts)
+    query = 'compute the factorial of a number'
+    expected = sorted(cosine_similarity(vectorizer.transform([query]), X)[0], reverse=True)[:3]
+
+    results = index.search(query, k=3)
+    assert [score for _, score, _ in results] == pytest.approx(expected, rel=1e-5)
+    assert 'factorial' in results[0][0]
+
+def test_incremental_add_is_searchable_before_merge():
+    prompts, codes = load_pairs()
+    index = SnippetIndex()
+    index.add(prompts, codes)
+    index.merge()
+
+    index.add(['reverse a linked list'], ['def reverse(head): ...'])
+    assert index.search('reverse linked list', k=1)[0][0] == 'def reverse(head): ...'
+
+def test_save_and_load_round_trip(tmp_path):
+    prompts, codes = load_pairs()
+    index = SnippetIndex(approximate=True)
+    index.add(prompts, codes)
+    path = index.save(str(tmp_path / 'index.npz'))
+
+    loaded = SnippetIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.approximate
+    assert loaded.search('sort a list', k=1) == index.search('sort a list', k=1)
+
+def test_approximate_mode_finds_exact_duplicates():
+    prompts = [f'prompt number {i} about topic{i % 37} and item{i}' for i in range(3000)]
+    index = SnippetIndex(approximate=True)
+    index.add(prompts, [str(i) for i in range(3000)])
+    index.merge()
+    assert all(index.search(prompts[i], k=1)[0][2] == i for i in range(0, 3000, 97))
+
+def test_unknown_terms_return_nothing():
+    index = SnippetIndex()
+    index.add(['sort a list'], ['sorted(x)'])
+    assert index.search('zzz qqq') == []
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from nlp.streaming import holdout_mask, scan_classes, stream_train
+
+def write_corpus(path, rows=400):
+    lines = ['text,label']
+    for i in range(rows):
+        if i % 2:
+            lines.append(f'"the spell conjures spirit number {i}",magic')
+        else:
+            lines.append(f'"the cluster replicates shard number {i}",technology')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+@pytest.mark.parametrize('estimator', ['nb', 'logreg'])
+def test_stream_train_learns_in_chunks(tmp_path, estimator):
+    path = write_corpus(tmp_path / 'corpus.csv')
+    progress = []
+    model, matrix, classes = stream_train(
+        str(path), estimator=estimator, chunksize=50, progress=progress.append
+    )
+    assert classes == ['magic', 'technology']
+    assert np.trace(matrix) / matrix.sum() > 0.95
+    train_updates = [p for p in progress if p['phase'] == 'train']
+    assert len(train_updates) == 8
+    assert train_updates[-1]['rows'] == 400
+    assert list(model.predict(['a spell of spirit'])) == ['magic']
+
+def test_holdout_split_does_not_depend_on_chunksize():
+    whole = holdout_mask(0, 1000, 0.2)
+    pieces = np.concatenate([holdout_mask(o, 100, 0.2) for o in range(0, 1000, 100)])
+    assert (whole == pieces).all()
+    assert 0.15 < whole.mean() < 0.25
+
+def test_scan_classes_reads_label_column(tmp_path):
+    path = write_corpus(tmp_path / 'corpus.csv', rows=10)
+    assert scan_classes(str(path), chunksize=3) == ['magic', 'technology']
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from nlp import engine
+
+def is_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+def write_corpus(path, rows=60):
+    lines = ['text,label']
+    for i in range(rows):
+        if i % 2:
+            lines.append(f'"the spell conjures spirit number {i}",magic')
+        else:
+            lines.append(f'"the cluster replicates shard number {i}",technology')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+def test_features_are_cached_and_memory_mapped(tmp_path, monkeypatch):
+    path = write_corpus(tmp_path / 'corpus.csv')
+    X, y, vocab, cache_path = engine.load_features(path, cache_dir=tmp_path / 'cache')
+    assert X.shape == (60, len(vocab))
+    assert is_mapped(X.data) and is_mapped(X.indices) and is_mapped(X.indptr)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('corpus was re-tokenized')
+
+    monkeypatch.setattr(engine.CountVectorizer, 'fit_transform', fail)
+    X2, y2, _, cache_path2 = engine.load_features(path, cache_dir=tmp_path / 'cache')
+    assert cache_path2 == cache_path
+    assert (X2 != X).nnz == 0 and list(y2) == list(y)
+
+def test_cache_key_tracks_content_and_params(tmp_path):
+    path = write_corpus(tmp_path / 'corpus.csv')
+    key = engine.cache_key(path, {}, 'text', 'label')
+    assert engine.cache_key(path, {'ngram_range': (1, 2)}, 'text', 'label') != key
+    write_corpus(path, rows=61)
+    assert engine.cache_key(path, {}, 'text', 'label') != key
+
+def test_grid_search_across_processes(tmp_path):
+    path = write_corpus(tmp_path / 'corpus.csv')
+    grid = {'clf__alpha': [0.1, 1.0], 'tfidf__sublinear_tf': [False, True]}
+    results = engine.grid_search(path, 'nb', grid, cv=3, n_jobs=2, cache_dir=tmp_path / 'cache')
+    assert len(results) == 4
+    scores = [r['mean_f1_macro'] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] > 0.9
+
+def test_train_returns_pipeline_for_raw_text(tmp_path):
+    path = write_corpus(tmp_path / 'corpus.csv')
+    model = engine.train(path, 'logreg', cache_dir=tmp_path / 'cache', report=False)
+    assert list(model.predict(['a spell of spirit', 'shard cluster'])) == ['magic', 'technology']
+
+def test_search_and_train_uses_best_grid_point(tmp_path, capsys):
+    path = write_corpus(tmp_path / 'corpus.csv')
+    model = engine.search_and_train(path, 'nb', search=True, n_jobs=1, cache_dir=tmp_path / 'cache')
+    ranking = [line for line in capsys.readouterr().out.splitlines() if '±' in line]
+    assert len(ranking) == 6  # one row per DEFAULT_GRIDS['nb'] point
+    assert list(model.predict(['a spell of spirit'])) == ['magic']
@@ -1,3 +1,12 @@
+import numpy as np
+
+# Largest power of ten whose digits fit comfortably in an int64 chunk
+_CHUNK_DIGITS = 18
+_INT64_SAFE = 10 ** _CHUNK_DIGITS
+_INT64_MAX = np.iinfo(np.int64).max
+_SEPARATORS = np.frombuffer(b" \t\r\n", dtype=np.uint8)
+
+
 def digit_sum_magic(number: int) -> dict:
     """Return steps reducing number to a single digit via digit sums."""
     original = number
@@ -10,8 +19,238 @@ def digit_sum_magic(number: int) -> dict:
     return {"original": original, "steps": steps, "result": number}
 
 
+def digital_root(number: int) -> int:
+    """Closed-form result of digit_sum_magic; O(1) digit work for any int size."""
+    if number < 10:
+        return number
+    return 1 + (number - 1) % 9
+
+
+def _as_int64(numbers) -> np.ndarray:
+    """``numbers`` as an int64 array; ValueError instead of wrapping values that do not fit."""
+    array = np.asarray(numbers)
+    if array.dtype.kind == "u" and array.size and array.max() > _INT64_MAX:
+        raise ValueError("values above 2**63 - 1 need digit_sum_magic_big")
+    try:
+        return array.astype(np.int64, copy=False)
+    except OverflowError:
+        raise ValueError("values outside int64 need digit_sum_magic_big") from None
+
+
+def digital_roots(numbers) -> np.ndarray:
+    """Vectorized digital_root over an integer array."""
+    numbers = _as_int64(numbers)
+    return np.where(numbers < 10, numbers, 1 + (numbers - 1) % 9)
+
+
+def digit_sums(numbers) -> np.ndarray:
+    """Vectorized single digit-sum step over a non-negative int64 array."""
+    remaining = _as_int64(numbers).copy()
+    if (remaining < 0).any():
+        raise ValueError("digit sums need non-negative integers")
+    total = np.zeros_like(remaining)
+    while remaining.any():
+        remaining, digit = np.divmod(remaining, 10)
+        total += digit
+    return total
+
+
+def digit_sum_magic_batch(numbers, steps: bool = True) -> dict:
+    """Digital roots and step counts for an integer array without per-item Python loops.
+
+    With ``steps=False`` only the closed-form roots are computed.
+    """
+    numbers = _as_int64(numbers)
+    if not steps:
+        return {"result": digital_roots(numbers)}
+
+    current = numbers.copy()
+    counts = np.zeros(len(current), dtype=np.int64)
+    active = np.flatnonzero(current >= 10)
+    while len(active):
+        current[active] = digit_sums(current[active])
+        counts[active] += 1
+        active = active[current[active] >= 10]
+    return {"result": current, "steps": counts}
+
+
+def _digit_chunks(number: int, chunk_digits: int = _CHUNK_DIGITS):
+    """Yield ``number`` as base-10**chunk_digits limbs without building str(number).
+
+    The number is split recursively at powers of ten so the whole decimal
+    expansion is never materialized and int_max_str_digits does not apply.
+    """
+    powers = [10 ** chunk_digits]
+    while powers[-1] * powers[-1] <= number:
+        powers.append(powers[-1] * powers[-1])
+
+    stack = [(number, len(powers) - 1)]
+    while stack:
+        value, level = stack.pop()
+        if value < powers[0]:
+            yield value
+            continue
+        while level > 0 and powers[level] > value:
+            level -= 1
+        high, low = divmod(value, powers[level])
+        # Low half first is fine: digit sums do not depend on order
+        stack.append((high, level))
+        stack.append((low, level))
+
+
+def digit_sum_big(number: int, chunk_digits: int = _CHUNK_DIGITS) -> int:
+    """Digit sum of an arbitrarily large non-negative int, chunk by chunk."""
+    if number < 0:
+        raise ValueError("digit sums need non-negative integers")
+    if number < _INT64_SAFE:
+        return int(digit_sums([number])[0])
+    total, batch = 0, []
+    for limb in _digit_chunks(number, chunk_digits):
+        batch.append(limb)
+        if len(batch) >= 4096:
+            total += int(digit_sums(batch).sum())
+            batch = []
+    if batch:
+        total += int(digit_sums(batch).sum())
+    return total
+
+
+def digit_sum_magic_big(number: int) -> dict:
+    """Result and step count for huge ints; only the first step touches every digit."""
+    if number < 10:
+        return {"result": number, "steps": 0}
+    first = digit_sum_big(number)
+    rest = digit_sum_magic_batch([first])
+    return {"result": int(rest["result"][0]), "steps": 1 + int(rest["steps"][0])}
+
+
+def _from_digit_sums(sums, significant) -> dict:
+    """Results and step counts for numbers known only by digit sum and significant digits."""
+    # A number >= 10 takes one step to reach its digit sum, then continues from there
+    after = digit_sum_magic_batch(np.asarray(sums, dtype=np.int64))
+    return {
+        "result": after["result"],
+        "steps": np.where(np.asarray(significant) > 1, 1 + after["steps"], 0),
+    }
+
+
+def _extend_digit_sum(pending, data: bytes) -> tuple:
+    """Fold a run of decimal digits into a ``(digit_sum, significant_digits)`` pair."""
+    total, significant = pending
+    digits = np.frombuffer(data, dtype=np.uint8) - ord("0")
+    if significant:
+        significant += digits.size
+    else:
+        nonzero = np.flatnonzero(digits)
+        if nonzero.size:
+            significant = digits.size - int(nonzero[0])
+    return total + int(digits.sum(dtype=np.int64)), significant
+
+
+def _parse_block(data: bytes):
+    """Start and end offsets of every integer in ``data``, found in one pass."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    is_digit = (raw >= ord("0")) & (raw <= ord("9"))
+    if not np.isin(raw[~is_digit], _SEPARATORS).all():
+        raise ValueError("only non-negative decimal integers are supported")
+    edges = np.diff(is_digit.view(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _block_results(data: bytes, starts, ends) -> dict:
+    """Results and step counts for the integers of one block of complete lines.
+
+    Integers of up to 18 digits are parsed into int64 in one call and run
+    through digit_sum_magic_batch; only longer ones are reduced digit by digit.
+    """
+    count = len(starts)
+    result = np.zeros(count, dtype=np.int64)
+    steps = np.zeros(count, dtype=np.int64)
+    if not count:
+        return {"result": result, "steps": steps}
+
+    short = ends - starts <= _CHUNK_DIGITS
+    if not short.all():
+        text = bytearray(data)
+        sums, sizes = [], []
+        for start, end in zip(starts[~short], ends[~short]):
+            total, significant = _extend_digit_sum((0, 0), data[start:end])
+            sums.append(total)
+            sizes.append(significant)
+            text[start:end] = b" " * (end - start)
+        rest = _from_digit_sums(sums, sizes)
+        result[~short], steps[~short] = rest["result"], rest["steps"]
+        data = bytes(text)
+
+    batch = digit_sum_magic_batch(np.fromstring(data, dtype=np.int64, sep=" "))
+    result[short], steps[short] = batch["result"], batch["steps"]
+    return {"result": result, "steps": steps}
+
+
+def stream_digit_sum_magic(path, block_size: int = 1 << 20):
+    """Yield ``{"result", "steps"}`` arrays per block of a file of decimal integers.
+
+    Each block is parsed in one vectorized pass. A number cut by the block
+    boundary is carried into the next block, or folded into a running digit
+    sum once it is longer than 18 digits, so a single number may be larger
+    than memory.
+    """
+    carry = b""
+    pending = None  # (digit_sum, significant_digits) of a long number spanning blocks
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            last = not block
+            data = carry + block
+            starts, ends = _parse_block(data)
+            carry = b""
+            parts = []
+
+            lo = 0
+            if pending is not None:
+                if len(starts) and starts[0] == 0:
+                    lo = int(ends[0])
+                    pending = _extend_digit_sum(pending, data[:lo])
+                    if lo == len(data) and not last:
+                        continue
+                    starts, ends = starts[1:], ends[1:]
+                parts.append(_from_digit_sums([pending[0]], [pending[1]]))
+                pending = None
+
+            cut = len(data)
+            if not last and len(ends) and ends[-1] == len(data):
+                cut = int(starts[-1])
+                if len(data) - cut > _CHUNK_DIGITS:
+                    pending = _extend_digit_sum((0, 0), data[cut:])
+                else:
+                    carry = data[cut:]
+                starts, ends = starts[:-1], ends[:-1]
+            parts.append(_block_results(data[lo:cut], starts - lo, ends - lo))
+
+            yield {
+                key: np.concatenate([part[key] for part in parts])
+                for key in ("result", "steps")
+            }
+            if last:
+                break
+
+
+def digit_sum_magic_file(path, block_size: int = 1 << 20) -> dict:
+    """Results and step counts for every integer in a file, one per line."""
+    blocks = list(stream_digit_sum_magic(path, block_size))
+    return {
+        key: np.concatenate([block[key] for block in blocks])
+        for key in ("result", "steps")
+    }
+
+
 if __name__ == '__main__':
     import sys
+    if len(sys.argv) > 2 and sys.argv[1] == '--file':
+        info = digit_sum_magic_file(sys.argv[2])
+        for result, steps in zip(info['result'], info['steps']):
+            print(f"{result} ({steps} steps)")
+        sys.exit(0)
     n = int(sys.argv[1]) if len(sys.argv) > 1 else 12345
     info = digit_sum_magic(n)
     print(f"Magic reduction of {info['original']}")
@@ -1,21 +1,27 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import make_pipeline
-from sklearn.metrics import classification_report
+import argparse
+import sys
+from pathlib import Path
 
+# Ensure the project root is in the Python path so `nlp` can be imported
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-def main():
-    data = pd.read_csv('training/data/narrative_samples.csv')
-    X_train, X_test, y_train, y_test = train_test_split(
-        data['text'], data['label'], test_size=0.2, random_state=42
+from nlp import engine
+
+DATA_PATH = 'training/data/narrative_samples.csv'
+
+
+def main(path=DATA_PATH, stream=False, chunksize=10000, search=False, jobs=None):
+    return engine.search_and_train(
+        path, 'nb', search=search, n_jobs=jobs, stream=stream, chunksize=chunksize
     )
-    model = make_pipeline(TfidfVectorizer(), MultinomialNB())
-    model.fit(X_train, y_train)
-    preds = model.predict(X_test)
-    print(classification_report(y_test, preds))
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Train the narrative genre classifier')
+    parser.add_argument('path', nargs='?', default=DATA_PATH)
+    parser.add_argument('--stream', action='store_true', help='train out-of-core in chunks')
+    parser.add_argument('--chunksize', type=int, default=10000)
+    parser.add_argument('--search', action='store_true', help='cross-validate a hyperparameter grid first')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes for --search')
+    args = parser.parse_args()
+    main(args.path, stream=args.stream, chunksize=args.chunksize, search=args.search, jobs=args.jobs)